@@ -156,6 +156,47 @@ if not DEBUG:
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Logging: records are dropped onto an in-memory queue and written by a
+# background listener, so background threads never block on stdout writes
+import atexit
+import logging
+import logging.handlers
+import queue
+
+LOG_QUEUE = queue.SimpleQueue()
+
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(
+    logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s')
+)
+_log_listener = logging.handlers.QueueListener(
+    LOG_QUEUE, _log_stream_handler, respect_handler_level=True
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'queue': {
+            'class': 'logging.handlers.QueueHandler',
+            'queue': LOG_QUEUE,
+        },
+    },
+    'loggers': {
+        'cryptos': {
+            'handlers': ['queue'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+    'root': {
+        'handlers': ['queue'],
+        'level': 'WARNING',
+    },
+}
+
 # API Configuration
 COINGECKO_API_URL = config('COINGECKO_API_URL', default='https://api.coingecko.com/api/v3')
 BINANCE_API_URL = config('BINANCE_API_URL', default='https://api.binance.com/api/v3')
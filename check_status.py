@@ -10,70 +10,77 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cf_cryptoiq.settings')
 django.setup()
 
 from cryptos.models import AppSettings, Crypto, TechnicalAnalysis
-from cryptos.services.ollama_service import OllamaService
 
-print("=" * 60)
-print("CRYPTO BOT STATUS CHECK")
-print("=" * 60)
+# Buffer all output and write it in one go at the end
+lines = []
+
+lines.append("=" * 60)
+lines.append("CRYPTO BOT STATUS CHECK")
+lines.append("=" * 60)
 
 # Check AppSettings
-print("\n1. App Settings:")
+lines.append("\n1. App Settings:")
 try:
     settings = AppSettings.get_settings()
-    print(f"   [OK] Settings loaded")
-    print(f"   - Ollama URL: {settings.ollama_base_url}")
-    print(f"   - Ollama Model: {settings.ollama_model}")
-    print(f"   - Auto Update Prices: {settings.auto_update_prices}")
-    print(f"   - Auto Run Analysis: {settings.auto_run_analysis}")
-    print(f"   - Price Update Interval: {settings.price_update_interval} minutes")
-    print(f"   - Analysis Interval: {settings.analysis_interval} minutes")
+    lines.append(f"   [OK] Settings loaded")
+    lines.append(f"   - Ollama URL: {settings.ollama_base_url}")
+    lines.append(f"   - Ollama Model: {settings.ollama_model}")
+    lines.append(f"   - Auto Update Prices: {settings.auto_update_prices}")
+    lines.append(f"   - Auto Run Analysis: {settings.auto_run_analysis}")
+    lines.append(f"   - Price Update Interval: {settings.price_update_interval} minutes")
+    lines.append(f"   - Analysis Interval: {settings.analysis_interval} minutes")
     if settings.last_price_update:
-        print(f"   - Last Price Update: {settings.last_price_update}")
+        lines.append(f"   - Last Price Update: {settings.last_price_update}")
     if settings.last_analysis_run:
-        print(f"   - Last Analysis Run: {settings.last_analysis_run}")
+        lines.append(f"   - Last Analysis Run: {settings.last_analysis_run}")
 except Exception as e:
-    print(f"   [ERROR] Error loading settings: {e}")
+    lines.append(f"   [ERROR] Error loading settings: {e}")
 
 # Check Cryptos
-print("\n2. Registered Cryptos:")
+lines.append("\n2. Registered Cryptos:")
 try:
-    cryptos = Crypto.objects.all()
-    print(f"   [OK] Found {cryptos.count()} cryptocurrencies")
+    cryptos = list(Crypto.objects.only('symbol', 'name'))
+    lines.append(f"   [OK] Found {len(cryptos)} cryptocurrencies")
     for crypto in cryptos:
-        print(f"   - {crypto.symbol} ({crypto.name})")
+        lines.append(f"   - {crypto.symbol} ({crypto.name})")
 except Exception as e:
-    print(f"   [ERROR] Error loading cryptos: {e}")
+    lines.append(f"   [ERROR] Error loading cryptos: {e}")
 
 # Check Ollama Connection
-print("\n3. Ollama Connection:")
+lines.append("\n3. Ollama Connection:")
 try:
+    # Imported lazily so the DB-only sections run without the Ollama stack
+    from cryptos.services.ollama_service import OllamaService
     settings = AppSettings.get_settings()
     ollama_service = OllamaService(base_url=settings.ollama_base_url)
     models = ollama_service.list_models()
     if models:
-        print(f"   [OK] Connected to Ollama")
-        print(f"   [OK] Found {len(models)} available models:")
+        lines.append(f"   [OK] Connected to Ollama")
+        lines.append(f"   [OK] Found {len(models)} available models:")
         for model in models[:5]:  # Show first 5
-            print(f"     - {model['name']}")
+            lines.append(f"     - {model['name']}")
         if len(models) > 5:
-            print(f"     ... and {len(models) - 5} more")
+            lines.append(f"     ... and {len(models) - 5} more")
     else:
-        print(f"   [WARNING] Connected but no models found")
+        lines.append(f"   [WARNING] Connected but no models found")
 except Exception as e:
-    print(f"   [ERROR] Error connecting to Ollama: {e}")
+    lines.append(f"   [ERROR] Error connecting to Ollama: {e}")
 
 # Check Technical Analyses
-print("\n4. Technical Analyses:")
+lines.append("\n4. Technical Analyses:")
 try:
-    analyses = TechnicalAnalysis.objects.all()
-    print(f"   [OK] Found {analyses.count()} analyses")
-    if analyses.exists():
-        latest = analyses.order_by('-analysis_date').first()
-        print(f"   - Latest: {latest.crypto.symbol} - {latest.recommendation.upper()} ({latest.confidence_score}%)")
+    analyses_qs = TechnicalAnalysis.objects.select_related('crypto')
+    analyses_count = analyses_qs.count()
+    lines.append(f"   [OK] Found {analyses_count} analyses")
+    if analyses_count:
+        latest = analyses_qs.order_by('-analysis_date').first()
+        lines.append(f"   - Latest: {latest.crypto.symbol} - {latest.recommendation.upper()} ({latest.confidence_score}%)")
 except Exception as e:
-    print(f"   [ERROR] Error loading analyses: {e}")
+    lines.append(f"   [ERROR] Error loading analyses: {e}")
 
-print("\n" + "=" * 60)
-print("Status check complete!")
-print("=" * 60)
+lines.append("\n" + "=" * 60)
+lines.append("Status check complete!")
+lines.append("=" * 60)
 
+sys.stdout.write('\n'.join(lines) + '\n')
+sys.stdout.flush()
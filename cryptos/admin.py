@@ -16,6 +16,14 @@ class PriceHistoryAdmin(admin.ModelAdmin):
     search_fields = ['crypto__symbol', 'crypto__name']
     date_hierarchy = 'timestamp'
 
+    def get_queryset(self, request):
+        # JOIN-fetch the crypto FK and skip the Decimal columns the
+        # changelist never renders
+        return super().get_queryset(request).select_related('crypto').only(
+            'timestamp', 'price', 'volume', 'created_at',
+            'crypto__symbol', 'crypto__name'
+        )
+
 
 @admin.register(TechnicalAnalysis)
 class TechnicalAnalysisAdmin(admin.ModelAdmin):
@@ -24,6 +32,14 @@ class TechnicalAnalysisAdmin(admin.ModelAdmin):
     search_fields = ['crypto__symbol', 'crypto__name']
     date_hierarchy = 'analysis_date'
 
+    def get_queryset(self, request):
+        # JOIN-fetch the crypto FK and skip the JSON/text columns the
+        # changelist never renders
+        return super().get_queryset(request).select_related('crypto').only(
+            'analysis_date', 'recommendation', 'confidence_score', 'created_at',
+            'crypto__symbol', 'crypto__name'
+        )
+
 
 @admin.register(AppSettings)
 class AppSettingsAdmin(admin.ModelAdmin):
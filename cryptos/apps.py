@@ -8,6 +8,11 @@ class CryptosConfig(AppConfig):
     def ready(self):
         """Start background tasks when app is ready"""
         import os
+        import sys
+        # Skip for one-off management commands that never serve traffic
+        skip_commands = {'makemigrations', 'migrate', 'collectstatic', 'shell', 'test', 'check'}
+        if skip_commands.intersection(sys.argv):
+            return
         # Only start background tasks if not in migration or test mode
         if os.environ.get('RUN_MAIN') == 'true':
             try:
@@ -1,9 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
 from django.core.management.base import BaseCommand
 from cryptos.models import Crypto, TechnicalAnalysis
-from cryptos.services.api_manager import APIManager
-from cryptos.services.technical_indicators import TechnicalIndicators
-from cryptos.services.ollama_analyzer import OllamaAnalyzer
-import pandas as pd
 from django.utils import timezone
 
 
@@ -22,133 +21,161 @@ class Command(BaseCommand):
             default=30,
             help='Number of days of historical data to use (default: 30)',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Number of concurrent analysis workers (default: 8)',
+        )
 
     def handle(self, *args, **options):
-        api_manager = APIManager()
+        # Heavy imports deferred so plain manage.py invocations stay fast
+        from cryptos.services.api_manager import api_manager
+        from cryptos.services.ollama_analyzer import OllamaAnalyzer
+
         ollama_analyzer = OllamaAnalyzer()
-        
+
         if options['symbol']:
             cryptos = Crypto.objects.filter(symbol=options['symbol'].upper())
         else:
             cryptos = Crypto.objects.all()
-        
-        if not cryptos.exists():
+        cryptos = list(cryptos.only('id', 'symbol'))
+
+        if not cryptos:
             self.stdout.write(self.style.WARNING('No cryptocurrencies found to analyze.'))
             return
-        
+
         days = options['days']
-        analyzed_count = 0
-        error_count = 0
-        
-        for crypto in cryptos:
-            try:
-                self.stdout.write(f'Analyzing {crypto.symbol}...')
-                
-                # Get current price
-                price_data = api_manager.get_current_price(crypto.symbol)
-                if not price_data:
-                    self.stdout.write(
-                        self.style.ERROR(f'Failed to fetch current price for {crypto.symbol}')
-                    )
-                    error_count += 1
-                    continue
-                
-                current_price = price_data['price']
-                
-                # Get historical data
-                historical_data = api_manager.get_historical_data(crypto.symbol, days=days)
-                if not historical_data or 'data' not in historical_data:
-                    self.stdout.write(
-                        self.style.ERROR(f'Failed to fetch historical data for {crypto.symbol}')
-                    )
-                    error_count += 1
-                    continue
-                
-                # Convert to DataFrame
-                if historical_data['source'] == 'binance':
-                    klines = historical_data['data']
-                    df_data = []
-                    for kline in klines:
-                        df_data.append({
-                            'timestamp': kline['timestamp'],
-                            'open': kline['open'],
-                            'high': kline['high'],
-                            'low': kline['low'],
-                            'close': kline['close'],
-                            'volume': kline['volume']
-                        })
-                    df = pd.DataFrame(df_data)
-                else:
-                    # CoinGecko data
-                    prices = historical_data['data'].get('prices', [])
-                    df_data = []
-                    for price_point in prices:
-                        df_data.append({
-                            'timestamp': price_point['timestamp'],
-                            'open': price_point['price'],
-                            'high': price_point['price'],
-                            'low': price_point['price'],
-                            'close': price_point['price'],
-                            'volume': 0
-                        })
-                    df = pd.DataFrame(df_data)
-                
-                if df.empty:
-                    self.stdout.write(
-                        self.style.ERROR(f'No data available for {crypto.symbol}')
-                    )
-                    error_count += 1
-                    continue
-                
-                # Calculate technical indicators
-                tech_indicators = TechnicalIndicators(df)
-                indicators = tech_indicators.get_latest_values()
-                
-                if not indicators:
-                    self.stdout.write(
-                        self.style.ERROR(f'Failed to calculate indicators for {crypto.symbol}')
-                    )
-                    error_count += 1
-                    continue
-                
-                # Run Ollama analysis
-                self.stdout.write(f'Running AI analysis for {crypto.symbol}...')
-                analysis_result = ollama_analyzer.analyze_with_ollama(
-                    indicators,
-                    crypto.symbol,
-                    current_price
-                )
-                
-                # Save or update analysis
-                analysis, created = TechnicalAnalysis.objects.update_or_create(
-                    crypto=crypto,
-                    defaults={
-                        'indicators': indicators,
-                        'recommendation': analysis_result['recommendation'],
-                        'confidence_score': analysis_result['confidence_score'],
-                        'ollama_reasoning': analysis_result['reasoning'],
-                        'analysis_date': timezone.now()
-                    }
-                )
-                
-                analyzed_count += 1
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f'Analysis complete for {crypto.symbol}: '
-                        f'{analysis_result["recommendation"].upper()} '
-                        f'({analysis_result["confidence_score"]}% confidence)'
-                    )
+        self._write_lock = threading.Lock()
+
+        # API fetches and Ollama inference are I/O-bound; run them
+        # concurrently and keep the DB writes on the main thread below.
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            outcomes = list(executor.map(
+                lambda crypto: self._analyze_one(api_manager, ollama_analyzer, days, crypto),
+                cryptos
+            ))
+
+        results = [outcome for outcome in outcomes if outcome is not None]
+        analyzed_count = len(results)
+        error_count = len(outcomes) - analyzed_count
+
+        # Save all analyses in two queries (bulk_update + bulk_create)
+        if results:
+            existing = {
+                analysis.crypto_id: analysis
+                for analysis in TechnicalAnalysis.objects.filter(
+                    crypto__in=[crypto for crypto, _, _ in results]
                 )
-                
-            except Exception as e:
-                error_count += 1
-                self.stdout.write(
-                    self.style.ERROR(f'Error analyzing {crypto.symbol}: {str(e)}')
+            }
+            now = timezone.now()
+            to_update = []
+            to_create = []
+            for crypto, indicators, analysis_result in results:
+                analysis = existing.get(crypto.id)
+                if analysis:
+                    analysis.indicators = indicators
+                    analysis.recommendation = analysis_result['recommendation']
+                    analysis.confidence_score = analysis_result['confidence_score']
+                    analysis.ollama_reasoning = analysis_result['reasoning']
+                    analysis.analysis_date = now
+                    to_update.append(analysis)
+                else:
+                    to_create.append(TechnicalAnalysis(
+                        crypto=crypto,
+                        indicators=indicators,
+                        recommendation=analysis_result['recommendation'],
+                        confidence_score=analysis_result['confidence_score'],
+                        ollama_reasoning=analysis_result['reasoning'],
+                        analysis_date=now
+                    ))
+            if to_update:
+                TechnicalAnalysis.objects.bulk_update(
+                    to_update,
+                    ['indicators', 'recommendation', 'confidence_score', 'ollama_reasoning', 'analysis_date']
                 )
-        
+            if to_create:
+                TechnicalAnalysis.objects.bulk_create(to_create)
+
         self.stdout.write(
             self.style.SUCCESS(
                 f'\nAnalysis complete: {analyzed_count} successful, {error_count} errors'
             )
         )
 
+    def _analyze_one(self, api_manager, ollama_analyzer, days, crypto):
+        """Fetch data, compute indicators and run AI analysis for one crypto"""
+        import numpy as np
+        import pandas as pd
+        from cryptos.services.technical_indicators import TechnicalIndicators
+
+        try:
+            self._write(f'Analyzing {crypto.symbol}...')
+
+            # Get current price
+            price_data = api_manager.get_current_price(crypto.symbol)
+            if not price_data:
+                self._write(self.style.ERROR(f'Failed to fetch current price for {crypto.symbol}'))
+                return None
+
+            current_price = price_data['price']
+
+            # Get historical data
+            historical_data = api_manager.get_historical_data(crypto.symbol, days=days)
+            if not historical_data or 'data' not in historical_data:
+                self._write(self.style.ERROR(f'Failed to fetch historical data for {crypto.symbol}'))
+                return None
+
+            # Convert to DataFrame column-wise (float64 arrays, no per-row dicts)
+            if historical_data['source'] == 'binance':
+                # Klines arrive as a ready NumPy-backed DataFrame
+                df = historical_data['data']
+            else:
+                # CoinGecko data only has a price per point
+                prices = historical_data['data'].get('prices', [])
+                price_col = np.asarray([p['price'] for p in prices], dtype=np.float64)
+                df = pd.DataFrame({
+                    'timestamp': [p['timestamp'] for p in prices],
+                    'open': price_col,
+                    'high': price_col,
+                    'low': price_col,
+                    'close': price_col,
+                    'volume': np.zeros(len(price_col), dtype=np.float64)
+                }, copy=False)
+
+            if df.empty:
+                self._write(self.style.ERROR(f'No data available for {crypto.symbol}'))
+                return None
+
+            # Calculate technical indicators
+            tech_indicators = TechnicalIndicators(df)
+            indicators = tech_indicators.get_latest_values()
+
+            if not indicators:
+                self._write(self.style.ERROR(f'Failed to calculate indicators for {crypto.symbol}'))
+                return None
+
+            # Run Ollama analysis
+            self._write(f'Running AI analysis for {crypto.symbol}...')
+            analysis_result = ollama_analyzer.analyze_with_ollama(
+                indicators,
+                crypto.symbol,
+                current_price
+            )
+
+            self._write(
+                self.style.SUCCESS(
+                    f'Analysis complete for {crypto.symbol}: '
+                    f'{analysis_result["recommendation"].upper()} '
+                    f'({analysis_result["confidence_score"]}% confidence)'
+                )
+            )
+            return (crypto, indicators, analysis_result)
+
+        except Exception as e:
+            self._write(self.style.ERROR(f'Error analyzing {crypto.symbol}: {str(e)}'))
+            return None
+
+    def _write(self, message):
+        with self._write_lock:
+            self.stdout.write(message)
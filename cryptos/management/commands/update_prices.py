@@ -1,6 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from cryptos.models import Crypto, PriceHistory
-from cryptos.services.api_manager import APIManager
+from cryptos.services.api_manager import api_manager
 from django.utils import timezone
 
 
@@ -13,67 +17,93 @@ class Command(BaseCommand):
             type=str,
             help='Update price for a specific cryptocurrency symbol',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Number of concurrent fetch workers (default: 8)',
+        )
 
     def handle(self, *args, **options):
-        api_manager = APIManager()
-        
+
         if options['symbol']:
             cryptos = Crypto.objects.filter(symbol=options['symbol'].upper())
         else:
             cryptos = Crypto.objects.all()
-        
-        if not cryptos.exists():
+        cryptos = list(cryptos)
+
+        if not cryptos:
             self.stdout.write(self.style.WARNING('No cryptocurrencies found to update.'))
             return
-        
-        updated_count = 0
-        error_count = 0
-        
-        for crypto in cryptos:
-            try:
-                self.stdout.write(f'Updating price for {crypto.symbol}...')
-                price_data = api_manager.get_current_price(crypto.symbol)
-                
-                if price_data:
-                    # Get market data for more complete information
-                    market_data = api_manager.get_market_data(crypto.symbol)
-                    
-                    price = price_data['price']
-                    high = market_data.get('high_24h', price) if market_data else price
-                    low = market_data.get('low_24h', price) if market_data else price
-                    volume = price_data.get('volume_24h', 0)
-                    
-                    # Create or update price history
-                    PriceHistory.objects.create(
-                        crypto=crypto,
-                        timestamp=timezone.now(),
-                        price=price,
-                        volume=volume,
-                        high=high,
-                        low=low,
-                        open_price=price,
-                        close_price=price
-                    )
-                    
-                    updated_count += 1
-                    self.stdout.write(
-                        self.style.SUCCESS(f'Successfully updated {crypto.symbol}: ${price:.2f}')
-                    )
-                else:
-                    error_count += 1
-                    self.stdout.write(
-                        self.style.ERROR(f'Failed to fetch price for {crypto.symbol}')
-                    )
-                    
-            except Exception as e:
-                error_count += 1
-                self.stdout.write(
-                    self.style.ERROR(f'Error updating {crypto.symbol}: {str(e)}')
+
+        self._write_lock = threading.Lock()
+        now = timezone.now()
+
+        # Warm the ticker cache for every symbol with one batch request
+        api_manager.prime_ticker_bundles([crypto.symbol for crypto in cryptos])
+
+        # Fetches are I/O-bound, so run them concurrently; DB writes stay
+        # on the main thread via the bulk_create below.
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            results = list(executor.map(
+                lambda crypto: self._fetch_one(api_manager, now, crypto),
+                cryptos
+            ))
+
+        rows = [row for row in results if row is not None]
+        updated_count = len(rows)
+        error_count = len(results) - updated_count
+
+        if rows:
+            for row in rows:
+                row.crypto.latest_price = row.price
+                row.crypto.latest_price_at = row.timestamp
+            with transaction.atomic():
+                # (crypto, timestamp) is unique; replayed samples are
+                # dropped by the DB instead of raising IntegrityError
+                PriceHistory.objects.bulk_create(rows, batch_size=500, ignore_conflicts=True)
+                Crypto.objects.bulk_update(
+                    [row.crypto for row in rows],
+                    ['latest_price', 'latest_price_at'],
+                    batch_size=500
                 )
-        
+
         self.stdout.write(
             self.style.SUCCESS(
                 f'\nUpdate complete: {updated_count} successful, {error_count} errors'
             )
         )
 
+    def _fetch_one(self, api_manager, now, crypto):
+        """Fetch current price data for one crypto and build its PriceHistory row"""
+        try:
+            self._write(f'Updating price for {crypto.symbol}...')
+            # One ticker call carries price and 24h high/low/volume
+            price_data = api_manager.get_ticker_bundle(crypto.symbol)
+
+            if price_data:
+                price = price_data['price']
+                high = price_data.get('high_24h', 0) or price
+                low = price_data.get('low_24h', 0) or price
+                volume = price_data.get('volume_24h', 0)
+
+                self._write(self.style.SUCCESS(f'Successfully updated {crypto.symbol}: ${price:.2f}'))
+                return PriceHistory(
+                    crypto=crypto,
+                    timestamp=now,
+                    price=price,
+                    volume=volume,
+                    high=high,
+                    low=low,
+                    open_price=price,
+                    close_price=price
+                )
+
+            self._write(self.style.ERROR(f'Failed to fetch price for {crypto.symbol}'))
+        except Exception as e:
+            self._write(self.style.ERROR(f'Error updating {crypto.symbol}: {str(e)}'))
+        return None
+
+    def _write(self, message):
+        with self._write_lock:
+            self.stdout.write(message)
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-08-26 07:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cryptos', '0005_alter_appsettings_ollama_model'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crypto',
+            name='latest_price',
+            field=models.DecimalField(blank=True, decimal_places=8, max_digits=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='crypto',
+            name='latest_price_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='appsettings',
+            name='ollama_base_url',
+            field=models.CharField(default='http://localhost:11434', max_length=200),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-08-26 07:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cryptos', '0006_crypto_latest_price'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pricehistory',
+            index=models.Index(fields=['crypto', '-timestamp'], include=('price', 'volume'), name='ph_crypto_ts_covering'),
+        ),
+        # The covering index subsumes the old plain (crypto, -timestamp)
+        # index, so keeping both only doubles insert-time maintenance
+        migrations.RemoveIndex(
+            model_name='pricehistory',
+            name='cryptos_pri_crypto__fedba6_idx',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-08-26 07:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cryptos', '0007_pricehistory_ph_crypto_ts_covering'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='technicalanalysis',
+            name='indicators_hash',
+            field=models.CharField(blank=True, default='', max_length=40),
+        ),
+    ]
@@ -1,6 +1,9 @@
 from django.db import models
+from django.db.models.signals import post_save
+from django.dispatch import receiver
 from django.utils import timezone
-import json
+from django.utils.functional import cached_property
+import time
 
 
 class Crypto(models.Model):
@@ -9,6 +12,10 @@ class Crypto(models.Model):
     amount = models.DecimalField(max_digits=20, decimal_places=8, default=0)
     purchase_price = models.DecimalField(max_digits=20, decimal_places=8, default=0)
     purchase_date = models.DateTimeField(default=timezone.now)
+    # Denormalized copy of the newest PriceHistory row so portfolio math
+    # doesn't need an ORDER BY ... LIMIT 1 per instance
+    latest_price = models.DecimalField(max_digits=20, decimal_places=8, null=True, blank=True)
+    latest_price_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -18,19 +25,39 @@ class Crypto(models.Model):
     def __str__(self):
         return f"{self.symbol} - {self.name}"
 
+    @cached_property
+    def _latest_price(self):
+        """Latest PriceHistory row, fetched once per instance"""
+        return self.price_history.order_by('-timestamp').only('price', 'timestamp').first()
+
+    def _latest_price_value(self):
+        """Latest known price, preferring the denormalized column"""
+        if self.latest_price is not None:
+            return self.latest_price
+        latest = self._latest_price
+        return latest.price if latest else None
+
     @property
     def current_value(self):
-        latest_price = self.price_history.order_by('-timestamp').first()
-        if latest_price:
-            return self.amount * latest_price.price
+        price = self._latest_price_value()
+        if price is not None:
+            return self.amount * price
         return 0
 
+    @property
+    def current_value_float(self):
+        """float current value for display-only paths; Decimal stays for DB writes"""
+        price = self._latest_price_value()
+        if price is not None:
+            return float(self.amount) * float(price)
+        return 0.0
+
     @property
     def profit_loss(self):
         if self.purchase_price > 0:
-            latest_price = self.price_history.order_by('-timestamp').first()
-            if latest_price:
-                current_value = self.amount * latest_price.price
+            price = self._latest_price_value()
+            if price is not None:
+                current_value = self.amount * price
                 purchase_value = self.amount * self.purchase_price
                 return current_value - purchase_value
         return 0
@@ -51,7 +78,14 @@ class PriceHistory(models.Model):
         ordering = ['-timestamp']
         unique_together = ['crypto', 'timestamp']
         indexes = [
-            models.Index(fields=['crypto', '-timestamp']),
+            # Covering index (Postgres) so the latest-price lookup is
+            # served from the index leaf pages alone; replaces the old
+            # plain (crypto, -timestamp) index, which it subsumes
+            models.Index(
+                fields=['crypto', '-timestamp'],
+                include=['price', 'volume'],
+                name='ph_crypto_ts_covering'
+            ),
         ]
 
     def __str__(self):
@@ -68,6 +102,9 @@ class TechnicalAnalysis(models.Model):
     crypto = models.ForeignKey(Crypto, on_delete=models.CASCADE, related_name='technical_analyses')
     analysis_date = models.DateTimeField(default=timezone.now)
     indicators = models.JSONField(default=dict)
+    # SHA-1 of the sorted indicator JSON; lets the analysis loop skip the
+    # Ollama call when nothing changed since the previous cycle
+    indicators_hash = models.CharField(max_length=40, blank=True, default='')
     recommendation = models.CharField(max_length=10, choices=RECOMMENDATION_CHOICES, default='hold')
     confidence_score = models.DecimalField(max_digits=5, decimal_places=2, default=0)
     ollama_reasoning = models.TextField(blank=True)
@@ -80,11 +117,14 @@ class TechnicalAnalysis(models.Model):
     def __str__(self):
         return f"{self.crypto.symbol} - {self.analysis_date} - {self.recommendation}"
 
-    def get_indicators_dict(self):
-        if isinstance(self.indicators, str):
-            return json.loads(self.indicators)
+    @cached_property
+    def indicators_dict(self):
+        # JSONField already hands back parsed Python objects on load
         return self.indicators if isinstance(self.indicators, dict) else {}
 
+    def get_indicators_dict(self):
+        return self.indicators_dict
+
 
 class AppSettings(models.Model):
     """Singleton model for application settings"""
@@ -114,13 +154,26 @@ class AppSettings(models.Model):
     def __str__(self):
         return "Application Settings"
 
+    # In-process cache; short TTL so writes from other processes surface
+    _cached = None
+    _cached_at = 0.0
+    _CACHE_TTL = 30  # seconds
+
     @classmethod
     def get_settings(cls):
-        """Get or create singleton settings instance"""
-        settings, created = cls.objects.get_or_create(pk=1)
-        return settings
+        """Get or create singleton settings instance (cached in-process)"""
+        now = time.monotonic()
+        if cls._cached is None or now - cls._cached_at > cls._CACHE_TTL:
+            cls._cached, _ = cls.objects.get_or_create(pk=1)
+            cls._cached_at = now
+        return cls._cached
 
     def save(self, *args, **kwargs):
         """Ensure only one settings instance exists"""
         self.pk = 1
         super().save(*args, **kwargs)
+
+
+@receiver(post_save, sender=AppSettings)
+def _invalidate_settings_cache(sender, **kwargs):
+    AppSettings._cached = None
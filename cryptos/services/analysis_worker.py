@@ -0,0 +1,224 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import threading
+import time
+import uuid
+
+# Small shared pool so several symbols can generate at once without the
+# request thread blocking for the duration of an Ollama call
+_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+# job_id -> (future, submitted_at); finished jobs linger briefly so the
+# client can collect the result before cleanup
+_JOBS = {}
+_JOBS_LOCK = threading.Lock()
+_JOB_MAX_AGE = 600.0
+
+# Deduplication key -> job_id for jobs submitted via submit_unique
+_ACTIVE_KEYS = {}
+
+
+def _reap_stale_jobs():
+    cutoff = time.monotonic() - _JOB_MAX_AGE
+    stale = [job_id for job_id, (future, submitted_at) in _JOBS.items()
+             if submitted_at < cutoff and future.done()]
+    for job_id in stale:
+        del _JOBS[job_id]
+    for key, job_id in list(_ACTIVE_KEYS.items()):
+        if job_id not in _JOBS:
+            del _ACTIVE_KEYS[key]
+
+
+def submit(func, *args, **kwargs):
+    """Run func on the worker pool; returns a job_id to poll with get_status"""
+    job_id = uuid.uuid4().hex
+    future = _EXECUTOR.submit(func, *args, **kwargs)
+    with _JOBS_LOCK:
+        _reap_stale_jobs()
+        _JOBS[job_id] = (future, time.monotonic())
+    return job_id
+
+
+def submit_unique(key, func, *args, **kwargs):
+    """Like submit, but while a job for key is still running, further
+    submissions return its job_id instead of queueing a duplicate"""
+    with _JOBS_LOCK:
+        existing = _ACTIVE_KEYS.get(key)
+        if existing is not None:
+            entry = _JOBS.get(existing)
+            if entry is not None and not entry[0].done():
+                return existing
+        _reap_stale_jobs()
+        job_id = uuid.uuid4().hex
+        _JOBS[job_id] = (_EXECUTOR.submit(func, *args, **kwargs), time.monotonic())
+        _ACTIVE_KEYS[key] = job_id
+    return job_id
+
+
+def _save_analysis(crypto, indicators, new_hash, analysis_result, latest):
+    """Persist an analysis result, keeping one row per crypto.
+
+    Updates the newest existing row when there is one, otherwise creates
+    it. Re-serializing the indicator JSON is the wide part of the row, so
+    it is skipped when the snapshot hash shows nothing changed.
+    """
+    from django.utils import timezone
+    from cryptos.models import TechnicalAnalysis
+
+    if latest:
+        latest.recommendation = analysis_result['recommendation']
+        latest.confidence_score = analysis_result['confidence_score']
+        latest.ollama_reasoning = analysis_result['reasoning']
+        latest.analysis_date = timezone.now()
+        update_fields = [
+            'recommendation', 'confidence_score', 'ollama_reasoning',
+            'analysis_date'
+        ]
+        if new_hash != latest.indicators_hash:
+            latest.indicators = indicators
+            latest.indicators_hash = new_hash
+            update_fields += ['indicators', 'indicators_hash']
+        latest.save(update_fields=update_fields)
+    else:
+        TechnicalAnalysis.objects.create(
+            crypto=crypto,
+            indicators=indicators,
+            indicators_hash=new_hash,
+            recommendation=analysis_result['recommendation'],
+            confidence_score=analysis_result['confidence_score'],
+            ollama_reasoning=analysis_result['reasoning']
+        )
+
+
+def run_crypto_analysis(crypto_id):
+    """Full indicator + Ollama analysis for one crypto, saved to the DB.
+
+    Runs on the worker pool so request threads only pay for submit();
+    returns the summary the polling endpoint hands back to the client.
+    """
+    # Imported here to keep module import light and avoid cycles
+    from cryptos.models import AppSettings, Crypto, TechnicalAnalysis
+    from cryptos.services.api_manager import api_manager
+    from cryptos.services.ollama_analyzer import OllamaAnalyzer
+    from cryptos.services.technical_indicators import TechnicalIndicators
+    import pandas as pd
+
+    crypto = Crypto.objects.get(id=crypto_id)
+    settings_obj = AppSettings.get_settings()
+
+    price_data = api_manager.get_current_price(crypto.symbol)
+    if not price_data:
+        raise RuntimeError(f'No price data available for {crypto.symbol}')
+
+    historical_data = api_manager.get_historical_data(
+        crypto.symbol, days=settings_obj.historical_days
+    )
+    if not historical_data or 'data' not in historical_data:
+        raise RuntimeError(f'No historical data available for {crypto.symbol}')
+
+    if historical_data['source'] == 'binance':
+        df = historical_data['data']
+    else:
+        prices = historical_data['data'].get('prices', [])
+        price_col = [p['price'] for p in prices]
+        df = pd.DataFrame({
+            'timestamp': [p['timestamp'] for p in prices],
+            'open': price_col,
+            'high': price_col,
+            'low': price_col,
+            'close': price_col,
+            'volume': 0.0
+        })
+    if df.empty:
+        raise RuntimeError(f'No data available for {crypto.symbol}')
+
+    indicators = TechnicalIndicators(df).get_latest_values()
+    analyzer = OllamaAnalyzer(
+        base_url=settings_obj.ollama_base_url,
+        model=settings_obj.ollama_model
+    )
+    analysis_result = analyzer.analyze_with_ollama(
+        indicators, crypto.symbol, price_data['price']
+    )
+
+    # One analysis row per crypto, like every other writer: update the
+    # newest row when one exists instead of appending on each submit
+    new_hash = hashlib.sha1(
+        json.dumps(indicators, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    _save_analysis(
+        crypto, indicators, new_hash, analysis_result,
+        TechnicalAnalysis.objects.filter(crypto=crypto).first()
+    )
+    return {
+        'crypto_id': crypto.id,
+        'symbol': crypto.symbol,
+        'recommendation': analysis_result['recommendation'],
+        'confidence_score': float(analysis_result['confidence_score']),
+        'reasoning': analysis_result['reasoning'],
+    }
+
+
+def refresh_analysis(crypto_id, indicators, current_price):
+    """Ollama stage for already-computed indicators, saved to the DB.
+
+    Mirrors the inline save logic crypto_analysis used before the LLM call
+    moved off the request thread: update the newest analysis row if one
+    exists, otherwise create it; when Ollama fails, a placeholder row is
+    only written for cryptos that have no analysis yet.
+    """
+    from cryptos.models import AppSettings, Crypto, TechnicalAnalysis
+    from cryptos.services.ollama_analyzer import OllamaAnalyzer
+
+    crypto = Crypto.objects.get(id=crypto_id)
+    settings_obj = AppSettings.get_settings()
+    latest = TechnicalAnalysis.objects.filter(crypto=crypto).first()
+    try:
+        analyzer = OllamaAnalyzer(
+            base_url=settings_obj.ollama_base_url,
+            model=settings_obj.ollama_model
+        )
+        analysis_result = analyzer.analyze_with_ollama(
+            indicators, crypto.symbol, current_price
+        )
+    except Exception as exc:
+        if latest:
+            return {'crypto_id': crypto.id, 'symbol': crypto.symbol,
+                    'error': f'Ollama analysis unavailable: {exc}'}
+        analysis_result = {
+            'recommendation': 'hold',
+            'confidence_score': 0,
+            'reasoning': f'Ollama analysis unavailable: {exc}'
+        }
+
+    new_hash = hashlib.sha1(
+        json.dumps(indicators, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    _save_analysis(crypto, indicators, new_hash, analysis_result, latest)
+    return {
+        'crypto_id': crypto.id,
+        'symbol': crypto.symbol,
+        'recommendation': analysis_result['recommendation'],
+        'confidence_score': float(analysis_result['confidence_score']),
+        'reasoning': analysis_result['reasoning'],
+    }
+
+
+def get_status(job_id):
+    """Poll a submitted job.
+
+    Returns {'status': 'pending'|'done'|'error'|'unknown'} plus 'result'
+    when done or 'error' when the job raised.
+    """
+    with _JOBS_LOCK:
+        entry = _JOBS.get(job_id)
+    if entry is None:
+        return {'status': 'unknown'}
+    future = entry[0]
+    if not future.done():
+        return {'status': 'pending'}
+    error = future.exception()
+    if error is not None:
+        return {'status': 'error', 'error': str(error)}
+    return {'status': 'done', 'result': future.result()}
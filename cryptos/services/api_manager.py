@@ -1,36 +1,79 @@
 from .coin_gecko_service import CoinGeckoService
 from .binance_service import BinanceService
-from datetime import datetime, timedelta
-from django.utils import timezone
+from .ttl_cache import TTLCache
+from concurrent.futures import Future, ThreadPoolExecutor
+import logging
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Shared across instances: views build a fresh APIManager per request, so
+# instance-level caches never saw a second hit. Prices stay fresh on a
+# short TTL; historical/market payloads change slowly and keep a longer one.
+_PRICE_CACHE = TTLCache(maxsize=1024, ttl=5)
+_DATA_CACHE = TTLCache(maxsize=256, ttl=60)
+
+# In-flight price fetches keyed by cache key: during the cache-miss window
+# concurrent callers for the same symbol wait on one shared future instead
+# of racing duplicate requests to the upstream.
+_INFLIGHT = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+# Uppercase and drop whitespace in one translate pass; intern the result
+# so cache-key dict lookups compare by identity
+_NORM_TABLE = str.maketrans({
+    ' ': None, '\t': None, '\n': None,
+    **{chr(c): chr(c - 32) for c in range(ord('a'), ord('z') + 1)}
+})
+
+
+def _norm(symbol):
+    return sys.intern(symbol.translate(_NORM_TABLE))
 
 
 class APIManager:
     def __init__(self):
         self.coingecko = CoinGeckoService()
         self.binance = BinanceService()
-        self.cache = {}
-        self.cache_duration = timedelta(minutes=5)
-
-    def _get_from_cache(self, key):
-        if key in self.cache:
-            data, timestamp = self.cache[key]
-            if timezone.now() - timestamp < self.cache_duration:
-                return data
-            else:
-                del self.cache[key]
-        return None
 
-    def _set_cache(self, key, data):
-        self.cache[key] = (data, timezone.now())
+    def _get_from_cache(self, key, cache=_PRICE_CACHE):
+        return cache.get(key)
+
+    def _set_cache(self, key, data, cache=_PRICE_CACHE):
+        cache[key] = data
 
     def get_current_price(self, symbol):
         # Clean symbol - remove spaces and convert to uppercase
-        symbol_clean = symbol.strip().upper().replace(' ', '')
+        symbol_clean = _norm(symbol)
         cache_key = f"price_{symbol_clean}"
         cached = self._get_from_cache(cache_key)
         if cached:
             return cached
 
+        # Miss: either own the fetch or wait on whoever already does
+        with _INFLIGHT_LOCK:
+            future = _INFLIGHT.get(cache_key)
+            if future is None:
+                future = Future()
+                _INFLIGHT[cache_key] = future
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            return future.result()
+        try:
+            result = self._fetch_current_price(symbol_clean, cache_key)
+            future.set_result(result)
+            return result
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with _INFLIGHT_LOCK:
+                _INFLIGHT.pop(cache_key, None)
+
+    def _fetch_current_price(self, symbol_clean, cache_key):
         # Try Binance first (faster, real-time)
         price_data = self.binance.get_ticker(symbol_clean)
         if price_data and price_data.get('price', 0) > 0:
@@ -45,9 +88,102 @@ class APIManager:
             self._set_cache(cache_key, result)
             return result
 
-        # Fallback to CoinGecko (with delay to avoid rate limits)
-        import time
-        time.sleep(0.5)  # Small delay before CoinGecko request
+        # Fallback to CoinGecko; the service enforces the shared
+        # rate-limit bucket itself
+        price_data = self.coingecko.get_current_price(symbol_clean)
+        if price_data and price_data.get('price', 0) > 0:
+            result = {
+                'price': price_data['price'],
+                'source': 'coingecko',
+                'high_24h': 0,
+                'low_24h': 0,
+                'volume_24h': price_data.get('volume_24h', 0),
+                'change_24h': price_data.get('change_24h', 0)
+            }
+            self._set_cache(cache_key, result)
+            return result
+
+        return None
+
+    def _price_or_none(self, symbol):
+        try:
+            return self.get_current_price(symbol)
+        except Exception:
+            logger.warning("price fetch failed for %s", symbol, exc_info=True)
+            return None
+
+    def prime_prices(self, symbols):
+        """Warm the price cache for many symbols with one Binance call"""
+        cleaned = [_norm(symbol) for symbol in symbols]
+        missing = [s for s in cleaned if self._get_from_cache(f"price_{s}") is None]
+        if not missing:
+            return
+        tickers = self.binance.get_tickers_bulk(missing)
+        for symbol_clean, ticker in tickers.items():
+            if ticker.get('price', 0) > 0:
+                self._set_cache(f"price_{symbol_clean}", self._bundle_from_ticker(ticker))
+
+    def get_current_prices(self, symbols):
+        """Fetch current prices for many symbols, batched where possible.
+
+        Returns {symbol: price_data or None}. One bulk ticker call covers
+        every cache miss Binance knows about; only the leftovers (fallback
+        provider, delisted symbols) fan out over the thread pool, and those
+        are mostly cache hits by then.
+        """
+        symbols = list(symbols)
+        if not symbols:
+            return {}
+        if len(symbols) > 1:
+            try:
+                self.prime_prices(symbols)
+            except Exception:
+                logger.warning("bulk price prime failed", exc_info=True)
+        if len(symbols) == 1:
+            return {symbols[0]: self._price_or_none(symbols[0])}
+        with ThreadPoolExecutor(max_workers=min(8, len(symbols))) as pool:
+            results = list(pool.map(self._price_or_none, symbols))
+        return dict(zip(symbols, results))
+
+    def _bundle_from_ticker(self, ticker):
+        return {
+            'price': ticker['price'],
+            'source': 'binance',
+            'high_24h': ticker.get('high', 0),
+            'low_24h': ticker.get('low', 0),
+            'volume_24h': ticker.get('quote_volume', 0),
+            'change_24h': ticker.get('price_change_percent', 0)
+        }
+
+    def prime_ticker_bundles(self, symbols):
+        """Warm the bundle cache for many symbols with one Binance call"""
+        cleaned = [_norm(symbol) for symbol in symbols]
+        missing = [s for s in cleaned if self._get_from_cache(f"bundle_{s}") is None]
+        if not missing:
+            return
+        tickers = self.binance.get_tickers_bulk(missing)
+        for symbol_clean, ticker in tickers.items():
+            if ticker.get('price', 0) > 0:
+                self._set_cache(f"bundle_{symbol_clean}", self._bundle_from_ticker(ticker))
+
+    def get_ticker_bundle(self, symbol):
+        """Get price and 24h market fields from a single upstream ticker call"""
+        symbol_clean = _norm(symbol)
+        cache_key = f"bundle_{symbol_clean}"
+        cached = self._get_from_cache(cache_key)
+        if cached:
+            return cached
+
+        # One Binance ticker call carries both price and 24h high/low
+        ticker = self.binance.get_ticker(symbol_clean)
+        if ticker and ticker.get('price', 0) > 0:
+            result = self._bundle_from_ticker(ticker)
+            self._set_cache(cache_key, result)
+            return result
+
+        # Fallback to CoinGecko (price only; no extra market call);
+        # the service enforces the shared rate-limit bucket itself
+
         price_data = self.coingecko.get_current_price(symbol_clean)
         if price_data and price_data.get('price', 0) > 0:
             result = {
@@ -65,9 +201,9 @@ class APIManager:
 
     def get_historical_data(self, symbol, days=30):
         # Clean symbol
-        symbol_clean = symbol.strip().upper().replace(' ', '')
+        symbol_clean = _norm(symbol)
         cache_key = f"historical_{symbol_clean}_{days}"
-        cached = self._get_from_cache(cache_key)
+        cached = self._get_from_cache(cache_key, cache=_DATA_CACHE)
         if cached:
             return cached
 
@@ -82,12 +218,12 @@ class APIManager:
             limit = min(days * 24 if interval == '1h' else days, 100)
             
             klines = self.binance.get_klines(symbol_clean, interval=interval, limit=limit)
-            if klines:
+            if klines is not None and not klines.empty:
                 result = {
                     'data': klines,
                     'source': 'binance'
                 }
-                self._set_cache(cache_key, result)
+                self._set_cache(cache_key, result, cache=_DATA_CACHE)
                 return result
 
         # Fallback to CoinGecko for longer history
@@ -97,16 +233,16 @@ class APIManager:
                 'data': historical,
                 'source': 'coingecko'
             }
-            self._set_cache(cache_key, result)
+            self._set_cache(cache_key, result, cache=_DATA_CACHE)
             return result
 
         return None
 
     def get_market_data(self, symbol):
         # Clean symbol
-        symbol_clean = symbol.strip().upper().replace(' ', '')
+        symbol_clean = _norm(symbol)
         cache_key = f"market_{symbol_clean}"
-        cached = self._get_from_cache(cache_key)
+        cached = self._get_from_cache(cache_key, cache=_DATA_CACHE)
         if cached:
             return cached
 
@@ -122,7 +258,7 @@ class APIManager:
                 'price_change_percentage_24h': ticker['price_change_percent'],
                 'source': 'binance'
             }
-            self._set_cache(cache_key, result)
+            self._set_cache(cache_key, result, cache=_DATA_CACHE)
             return result
 
         # Fallback to CoinGecko
@@ -132,7 +268,7 @@ class APIManager:
                 **market_data,
                 'source': 'coingecko'
             }
-            self._set_cache(cache_key, result)
+            self._set_cache(cache_key, result, cache=_DATA_CACHE)
             return result
 
         return None
@@ -141,3 +277,10 @@ class APIManager:
         # Use CoinGecko for search as it has better search functionality
         return self.coingecko.search_crypto(query)
 
+
+# Shared instance: both services hold requests.Sessions whose keep-alive
+# connection pools only pay off when every caller reuses them, and all
+# caches are module-level anyway, so per-request construction bought
+# nothing but session churn
+api_manager = APIManager()
+
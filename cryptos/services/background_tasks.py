@@ -1,239 +1,315 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import heapq
+import json
+import logging
 import threading
 import time
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
 from cryptos.models import AppSettings, Crypto, PriceHistory, TechnicalAnalysis
-from cryptos.services.api_manager import APIManager
+from cryptos.services.api_manager import api_manager
 from cryptos.services.technical_indicators import TechnicalIndicators
 from cryptos.services.ollama_analyzer import OllamaAnalyzer
 import pandas as pd
 import os
 
+logger = logging.getLogger(__name__)
+
+# Module-level singleton slot: once bound, __new__ resolves with a single
+# `is` compare and never touches the construction lock again
+_INSTANCE = None
+_INSTANCE_LOCK = threading.Lock()
+
+# Retry delays when a task cycle raises, per task name
+_RETRY_SECONDS = {'price_update': 60, 'analysis': 300}
+
 
 class BackgroundTaskManager:
-    _instance = None
-    _lock = threading.Lock()
-    _price_update_thread = None
-    _analysis_thread = None
+    _scheduler_thread = None
     _running = False
 
     def __new__(cls):
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-        return cls._instance
+        global _INSTANCE
+        if _INSTANCE is not None:
+            return _INSTANCE
+        with _INSTANCE_LOCK:
+            if _INSTANCE is None:
+                _INSTANCE = super().__new__(cls)
+        return _INSTANCE
 
     def __init__(self):
         if not hasattr(self, 'initialized'):
             self.initialized = True
             self._running = False
+            self._stop_event = threading.Event()
+            # Shared across both tasks so HTTP connections and the TTL
+            # cache are reused instead of duplicated per thread
+            self.api_manager = api_manager
+            # Per-symbol (last timestamp, bar count) -> indicators, so
+            # unchanged candle windows skip the full recompute
+            self._indicator_cache = {}
 
     def start(self):
         """Start background tasks"""
         if self._running:
             return
-        
+
         self._running = True
-        settings = AppSettings.get_settings()
-        
-        # Start price update thread if enabled
-        if settings.auto_update_prices:
-            self._start_price_updates()
-        
-        # Start analysis thread if enabled
-        if settings.auto_run_analysis:
-            self._start_analysis()
+        self._stop_event.clear()
+        # One scheduler thread drives both tasks off a deadline heap;
+        # the HTTP fan-out inside each task still uses a worker pool
+        self._scheduler_thread = threading.Thread(target=self._scheduler_loop, daemon=True)
+        self._scheduler_thread.start()
 
     def stop(self):
         """Stop background tasks"""
         self._running = False
-        if self._price_update_thread:
-            self._price_update_thread.join(timeout=5)
-        if self._analysis_thread:
-            self._analysis_thread.join(timeout=5)
-
-    def _start_price_updates(self):
-        """Start price update background thread"""
-        def price_update_loop():
-            api_manager = APIManager()
-            while self._running:
-                try:
-                    settings = AppSettings.get_settings()
-                    if not settings.auto_update_prices:
-                        break
-                    
-                    # Update prices for all cryptos
-                    cryptos = Crypto.objects.all()
-                    for crypto in cryptos:
-                        try:
-                            price_data = api_manager.get_current_price(crypto.symbol)
-                            if price_data:
-                                market_data = api_manager.get_market_data(crypto.symbol)
-                                
-                                price = price_data['price']
-                                high = market_data.get('high_24h', price) if market_data else price
-                                low = market_data.get('low_24h', price) if market_data else price
-                                volume = price_data.get('volume_24h', 0)
-                                
-                                PriceHistory.objects.create(
-                                    crypto=crypto,
-                                    timestamp=timezone.now(),
-                                    price=price,
-                                    volume=volume,
-                                    high=high,
-                                    low=low,
-                                    open_price=price,
-                                    close_price=price
-                                )
-                        except Exception as e:
-                            print(f"Error updating price for {crypto.symbol}: {e}")
-                    
-                    # Update last update time
-                    settings.last_price_update = timezone.now()
-                    settings.save(update_fields=['last_price_update'])
-                    
-                    # Wait for next interval
-                    interval_seconds = settings.price_update_interval * 60
-                    for _ in range(interval_seconds):
-                        if not self._running:
-                            break
-                        time.sleep(1)
-                        
-                except Exception as e:
-                    print(f"Error in price update loop: {e}")
-                    time.sleep(60)  # Wait 1 minute before retrying
-        
-        self._price_update_thread = threading.Thread(target=price_update_loop, daemon=True)
-        self._price_update_thread.start()
-
-    def _start_analysis(self):
-        """Start analysis background thread"""
-        def analysis_loop():
-            api_manager = APIManager()
-            ollama_analyzer = OllamaAnalyzer()
-            
-            while self._running:
+        self._stop_event.set()
+        if self._scheduler_thread:
+            self._scheduler_thread.join(timeout=5)
+
+    def _scheduler_loop(self):
+        """Run both tasks from a single thread, sleeping until the next deadline"""
+        ollama_analyzer = OllamaAnalyzer()
+        now = time.monotonic()
+        heap = [(now, 'price_update'), (now, 'analysis')]
+        heapq.heapify(heap)
+
+        while self._running:
+            next_run, name = heap[0]
+            delta = next_run - time.monotonic()
+            if delta > 0:
+                if self._stop_event.wait(delta):
+                    break
+                continue
+            heapq.heappop(heap)
+
+            try:
+                settings = AppSettings.get_settings()
+                if name == 'price_update':
+                    if settings.auto_update_prices:
+                        self._run_price_update(settings)
+                    interval = settings.price_update_interval * 60
+                else:
+                    if settings.auto_run_analysis:
+                        self._run_analysis(settings, ollama_analyzer)
+                    interval = settings.analysis_interval * 60
+            except Exception:
+                logger.exception("Error in %s task", name)
+                interval = _RETRY_SECONDS[name]
+
+            heapq.heappush(heap, (time.monotonic() + interval, name))
+
+    def _run_price_update(self, settings):
+        """Fetch prices for all cryptos concurrently, then batch the INSERTs"""
+        api_manager = self.api_manager
+        cryptos = list(Crypto.objects.only('id', 'symbol').iterator(chunk_size=500))
+        now = timezone.now()
+
+        # One batched Binance call covers every symbol; workers
+        # below then read from the warmed cache
+        api_manager.prime_ticker_bundles([crypto.symbol for crypto in cryptos])
+
+        def fetch_one(crypto):
+            try:
+                price_data = api_manager.get_ticker_bundle(crypto.symbol)
+                if price_data:
+                    price = price_data['price']
+                    high = price_data.get('high_24h', 0) or price
+                    low = price_data.get('low_24h', 0) or price
+                    volume = price_data.get('volume_24h', 0)
+
+                    return PriceHistory(
+                        crypto=crypto,
+                        timestamp=now,
+                        price=price,
+                        volume=volume,
+                        high=high,
+                        low=low,
+                        open_price=price,
+                        close_price=price
+                    )
+            except Exception:
+                logger.exception("Error updating price for %s", crypto.symbol)
+            return None
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            rows = [row for row in executor.map(fetch_one, cryptos) if row is not None]
+
+        if rows:
+            # Keep the denormalized latest-price columns on Crypto in step
+            # with the history rows, same as the update_prices command
+            for row in rows:
+                row.crypto.latest_price = row.price
+                row.crypto.latest_price_at = row.timestamp
+            with transaction.atomic():
+                # (crypto, timestamp) is unique; API replays within the
+                # same poll tick are dropped by the DB instead of raising
+                PriceHistory.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+                Crypto.objects.bulk_update(
+                    [row.crypto for row in rows],
+                    ['latest_price', 'latest_price_at'],
+                    batch_size=1000
+                )
+
+        # Update last update time
+        settings.last_price_update = timezone.now()
+        settings.save(update_fields=['last_price_update'])
+
+    def _run_analysis(self, settings, ollama_analyzer):
+        """Run indicator + Ollama analysis for all cryptos concurrently"""
+        api_manager = self.api_manager
+
+        # Update Ollama settings from AppSettings
+        ollama_analyzer.update_config(
+            base_url=settings.ollama_base_url,
+            model=settings.ollama_model
+        )
+
+        cryptos = list(Crypto.objects.only('id', 'symbol').iterator(chunk_size=500))
+        historical_days = settings.historical_days
+
+        # Stored indicator hashes let workers skip the Ollama call when a
+        # symbol's indicators are byte-identical to the previous cycle
+        existing_hashes = dict(
+            TechnicalAnalysis.objects.filter(crypto__in=cryptos)
+            .values_list('crypto_id', 'indicators_hash')
+        )
+
+        def analyze_one(crypto):
+            try:
+                # Get current price
+                price_data = api_manager.get_current_price(crypto.symbol)
+                if not price_data:
+                    return
+
+                current_price = price_data['price']
+
+                # Get historical data
+                historical_data = api_manager.get_historical_data(crypto.symbol, days=historical_days)
+                if not historical_data or 'data' not in historical_data:
+                    return
+
+                # Convert to DataFrame without per-row dict churn
+                if historical_data['source'] == 'binance':
+                    # Klines arrive as a ready NumPy-backed DataFrame
+                    df = historical_data['data']
+                else:
+                    prices = historical_data['data'].get('prices', [])
+                    price_col = [p['price'] for p in prices]
+                    df = pd.DataFrame({
+                        'timestamp': [p['timestamp'] for p in prices],
+                        'open': price_col,
+                        'high': price_col,
+                        'low': price_col,
+                        'close': price_col,
+                        'volume': 0.0
+                    })
+
+                if df.empty:
+                    return
+
+                # Reuse the previous cycle's indicators when no
+                # new candles arrived for this symbol
+                last_ts = df['timestamp'].iloc[-1]
+                cached = self._indicator_cache.get(crypto.symbol)
+                if cached and cached[0] == last_ts and cached[1] == len(df):
+                    indicators = cached[2]
+                else:
+                    tech_indicators = TechnicalIndicators(df)
+                    indicators = tech_indicators.get_latest_values()
+                    self._indicator_cache[crypto.symbol] = (last_ts, len(df), indicators)
+
+                if not indicators:
+                    return
+
+                indicators_hash = hashlib.sha1(
+                    json.dumps(indicators, sort_keys=True, default=str).encode()
+                ).hexdigest()
+                if existing_hashes.get(crypto.id) == indicators_hash:
+                    # Nothing moved since last cycle: skip the Ollama
+                    # round trip and only bump analysis_date below
+                    return (crypto, None, None, indicators_hash)
+
+                # Run Ollama analysis
                 try:
-                    settings = AppSettings.get_settings()
-                    if not settings.auto_run_analysis:
-                        break
-                    
-                    # Update Ollama settings from AppSettings
-                    ollama_analyzer.update_config(
-                        base_url=settings.ollama_base_url,
-                        model=settings.ollama_model
+                    analysis_result = ollama_analyzer.analyze_with_ollama(
+                        indicators,
+                        crypto.symbol,
+                        current_price
                     )
-                    
-                    # Run analysis for all cryptos
-                    cryptos = Crypto.objects.all()
-                    for crypto in cryptos:
-                        try:
-                            # Get current price
-                            price_data = api_manager.get_current_price(crypto.symbol)
-                            if not price_data:
-                                continue
-                            
-                            current_price = price_data['price']
-                            
-                            # Get historical data
-                            historical_data = api_manager.get_historical_data(crypto.symbol, days=settings.historical_days)
-                            if not historical_data or 'data' not in historical_data:
-                                continue
-                            
-                            # Convert to DataFrame
-                            if historical_data['source'] == 'binance':
-                                klines = historical_data['data']
-                                df_data = []
-                                for kline in klines:
-                                    df_data.append({
-                                        'timestamp': kline['timestamp'],
-                                        'open': kline['open'],
-                                        'high': kline['high'],
-                                        'low': kline['low'],
-                                        'close': kline['close'],
-                                        'volume': kline['volume']
-                                    })
-                                df = pd.DataFrame(df_data)
-                            else:
-                                prices = historical_data['data'].get('prices', [])
-                                df_data = []
-                                for price_point in prices:
-                                    df_data.append({
-                                        'timestamp': price_point['timestamp'],
-                                        'open': price_point['price'],
-                                        'high': price_point['price'],
-                                        'low': price_point['price'],
-                                        'close': price_point['price'],
-                                        'volume': 0
-                                    })
-                                df = pd.DataFrame(df_data)
-                            
-                            if df.empty:
-                                continue
-                            
-                            # Calculate indicators
-                            tech_indicators = TechnicalIndicators(df)
-                            indicators = tech_indicators.get_latest_values()
-                            
-                            if not indicators:
-                                continue
-                            
-                            # Run Ollama analysis
-                            try:
-                                analysis_result = ollama_analyzer.analyze_with_ollama(
-                                    indicators,
-                                    crypto.symbol,
-                                    current_price
-                                )
-                                
-                                # Save analysis
-                                TechnicalAnalysis.objects.update_or_create(
-                                    crypto=crypto,
-                                    defaults={
-                                        'indicators': indicators,
-                                        'recommendation': analysis_result['recommendation'],
-                                        'confidence_score': analysis_result['confidence_score'],
-                                        'ollama_reasoning': analysis_result['reasoning'],
-                                        'analysis_date': timezone.now()
-                                    }
-                                )
-                            except Exception as e:
-                                # If Ollama fails, save indicators with default analysis
-                                TechnicalAnalysis.objects.update_or_create(
-                                    crypto=crypto,
-                                    defaults={
-                                        'indicators': indicators,
-                                        'recommendation': 'hold',
-                                        'confidence_score': 0,
-                                        'ollama_reasoning': f'Ollama analysis unavailable: {str(e)}',
-                                        'analysis_date': timezone.now()
-                                    }
-                                )
-                        except Exception as e:
-                            print(f"Error analyzing {crypto.symbol}: {e}")
-                    
-                    # Update last analysis time
-                    settings.last_analysis_run = timezone.now()
-                    settings.save(update_fields=['last_analysis_run'])
-                    
-                    # Wait for next interval
-                    interval_seconds = settings.analysis_interval * 60
-                    for _ in range(interval_seconds):
-                        if not self._running:
-                            break
-                        time.sleep(1)
-                        
                 except Exception as e:
-                    print(f"Error in analysis loop: {e}")
-                    time.sleep(300)  # Wait 5 minutes before retrying
-        
-        self._analysis_thread = threading.Thread(target=analysis_loop, daemon=True)
-        self._analysis_thread.start()
+                    # If Ollama fails, keep indicators with a default analysis
+                    analysis_result = {
+                        'recommendation': 'hold',
+                        'confidence_score': 0,
+                        'reasoning': f'Ollama analysis unavailable: {str(e)}'
+                    }
+                return (crypto, indicators, analysis_result, indicators_hash)
+            except Exception:
+                logger.exception("Error analyzing %s", crypto.symbol)
+            return None
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = [r for r in executor.map(analyze_one, cryptos) if r is not None]
+
+        # Save all analyses with one bulk_update plus one bulk_create;
+        # unchanged symbols only get their analysis_date bumped
+        if results:
+            now = timezone.now()
+            unchanged_ids = [crypto.id for crypto, indicators, _, _ in results if indicators is None]
+            changed = [r for r in results if r[1] is not None]
+
+            if unchanged_ids:
+                TechnicalAnalysis.objects.filter(crypto_id__in=unchanged_ids).update(analysis_date=now)
+
+            if changed:
+                existing = {
+                    analysis.crypto_id: analysis
+                    for analysis in TechnicalAnalysis.objects.filter(
+                        crypto__in=[crypto for crypto, _, _, _ in changed]
+                    )
+                }
+                to_update = []
+                to_create = []
+                for crypto, indicators, analysis_result, indicators_hash in changed:
+                    analysis = existing.get(crypto.id)
+                    if analysis:
+                        analysis.indicators = indicators
+                        analysis.indicators_hash = indicators_hash
+                        analysis.recommendation = analysis_result['recommendation']
+                        analysis.confidence_score = analysis_result['confidence_score']
+                        analysis.ollama_reasoning = analysis_result['reasoning']
+                        analysis.analysis_date = now
+                        to_update.append(analysis)
+                    else:
+                        to_create.append(TechnicalAnalysis(
+                            crypto=crypto,
+                            indicators=indicators,
+                            indicators_hash=indicators_hash,
+                            recommendation=analysis_result['recommendation'],
+                            confidence_score=analysis_result['confidence_score'],
+                            ollama_reasoning=analysis_result['reasoning'],
+                            analysis_date=now
+                        ))
+                if to_update:
+                    TechnicalAnalysis.objects.bulk_update(
+                        to_update,
+                        ['indicators', 'indicators_hash', 'recommendation', 'confidence_score',
+                         'ollama_reasoning', 'analysis_date'],
+                        batch_size=500
+                    )
+                if to_create:
+                    TechnicalAnalysis.objects.bulk_create(to_create, batch_size=500)
+
+        # Update last analysis time
+        settings.last_analysis_run = timezone.now()
+        settings.save(update_fields=['last_analysis_run'])
 
     def restart(self):
         """Restart background tasks with current settings"""
         self.stop()
         time.sleep(1)
         self.start()
-
@@ -1,22 +1,27 @@
+from functools import lru_cache
+import logging
 import requests
 from django.conf import settings
-from datetime import datetime
-import time
+import json
+import numpy as np
+import pandas as pd
+
+from .rate_limiter import BINANCE_BUCKET
+
+logger = logging.getLogger(__name__)
 
 
 class BinanceService:
     def __init__(self):
         self.base_url = settings.BINANCE_API_URL
         self.session = requests.Session()
-        self.last_request_time = 0
-        self.min_request_interval = 0.1  # Binance allows higher rate
+        # Size the connection pool for the concurrent sweep workers
+        adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
 
     def _rate_limit(self):
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        if time_since_last_request < self.min_request_interval:
-            time.sleep(self.min_request_interval - time_since_last_request)
-        self.last_request_time = time.time()
+        BINANCE_BUCKET.acquire()
 
     def _make_request(self, endpoint, params=None):
         self._rate_limit()
@@ -30,41 +35,64 @@ class BinanceService:
                 # Invalid symbol, try to get error message
                 try:
                     error_data = e.response.json()
-                    print(f"Binance API error for {params.get('symbol', 'unknown')}: {error_data.get('msg', str(e))}")
+                    logger.error("Binance API error for %s: %s",
+                                 params.get('symbol', 'unknown'), error_data.get('msg', str(e)))
                 except:
-                    print(f"Binance API error: {e}")
+                    logger.error("Binance API error: %s", e)
             else:
-                print(f"Binance API error: {e}")
+                logger.error("Binance API error: %s", e)
             return None
         except requests.exceptions.RequestException as e:
-            print(f"Binance API error: {e}")
+            logger.error("Binance API error: %s", e)
             return None
 
-    def _symbol_to_binance(self, symbol):
-        # Remove any spaces and convert to uppercase
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _symbol_to_binance(symbol):
+        # Symbols are a small bounded set, so after warm-up every call is
+        # a single cache-dict hit instead of strip/upper/replace churn
         symbol_clean = symbol.strip().upper().replace(' ', '')
         return f"{symbol_clean}USDT"
 
+    def _parse_ticker(self, symbol, data):
+        return {
+            'symbol': symbol,
+            'price': float(data.get('lastPrice', 0)),
+            'open_price': float(data.get('openPrice', 0)),
+            'high': float(data.get('highPrice', 0)),
+            'low': float(data.get('lowPrice', 0)),
+            'volume': float(data.get('volume', 0)),
+            'quote_volume': float(data.get('quoteVolume', 0)),
+            'price_change': float(data.get('priceChange', 0)),
+            'price_change_percent': float(data.get('priceChangePercent', 0)),
+            'count': int(data.get('count', 0))
+        }
+
     def get_ticker(self, symbol):
         binance_symbol = self._symbol_to_binance(symbol)
         endpoint = "ticker/24hr"
         params = {'symbol': binance_symbol}
         data = self._make_request(endpoint, params)
         if data:
-            return {
-                'symbol': symbol,
-                'price': float(data.get('lastPrice', 0)),
-                'open_price': float(data.get('openPrice', 0)),
-                'high': float(data.get('highPrice', 0)),
-                'low': float(data.get('lowPrice', 0)),
-                'volume': float(data.get('volume', 0)),
-                'quote_volume': float(data.get('quoteVolume', 0)),
-                'price_change': float(data.get('priceChange', 0)),
-                'price_change_percent': float(data.get('priceChangePercent', 0)),
-                'count': int(data.get('count', 0))
-            }
+            return self._parse_ticker(symbol, data)
         return None
 
+    def get_tickers_bulk(self, symbols):
+        """Fetch 24hr tickers for many symbols with a single request"""
+        binance_symbols = [self._symbol_to_binance(symbol) for symbol in symbols]
+        endpoint = "ticker/24hr"
+        params = {'symbols': json.dumps(binance_symbols, separators=(',', ':'))}
+        data = self._make_request(endpoint, params)
+        if not data:
+            return {}
+        by_binance_symbol = {item.get('symbol'): item for item in data}
+        result = {}
+        for symbol, binance_symbol in zip(symbols, binance_symbols):
+            item = by_binance_symbol.get(binance_symbol)
+            if item:
+                result[symbol] = self._parse_ticker(symbol, item)
+        return result
+
     def get_klines(self, symbol, interval='1d', limit=100):
         binance_symbol = self._symbol_to_binance(symbol)
         endpoint = "klines"
@@ -75,22 +103,14 @@ class BinanceService:
         }
         data = self._make_request(endpoint, params)
         if data:
-            klines = []
-            for kline in data:
-                klines.append({
-                    'timestamp': datetime.fromtimestamp(kline[0] / 1000),
-                    'open': float(kline[1]),
-                    'high': float(kline[2]),
-                    'low': float(kline[3]),
-                    'close': float(kline[4]),
-                    'volume': float(kline[5]),
-                    'close_time': datetime.fromtimestamp(kline[6] / 1000),
-                    'quote_volume': float(kline[7]),
-                    'trades': int(kline[8]),
-                    'taker_buy_base': float(kline[9]),
-                    'taker_buy_quote': float(kline[10])
-                })
-            return klines
+            # Parse the whole kline array in C: one float64 cast for the
+            # OHLCV block instead of ~11 float() calls per row
+            arr = np.asarray(data, dtype=object)
+            prices = arr[:, 1:6].astype(np.float64)
+            ts = arr[:, 0].astype(np.int64) // 1000
+            df = pd.DataFrame(prices, columns=['open', 'high', 'low', 'close', 'volume'])
+            df['timestamp'] = pd.to_datetime(ts, unit='s')
+            return df
         return None
 
     def get_24h_stats(self, symbol):
@@ -1,37 +1,72 @@
+import logging
 import requests
 from django.conf import settings
 from datetime import datetime, timedelta
-import time
 from .coin_id_mapper import get_coingecko_id
+from .rate_limiter import COINGECKO_BUCKET
+from .ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Coin IDs are stable, so resolved symbols are memoized process-wide to
+# avoid repeating the rate-limited search round-trip
+_COIN_ID_CACHE = {}
 
 
 class CoinGeckoService:
     def __init__(self):
         self.base_url = settings.COINGECKO_API_URL
         self.session = requests.Session()
-        self.last_request_time = 0
-        self.min_request_interval = 2.0  # Rate limit: ~30 requests/minute (more conservative)
+        # Size the connection pool for the concurrent sweep workers
+        adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # CoinGecko payloads are stable for minutes; short-TTL response
+        # cache so repeat GETs skip both the network and the rate gate
+        self._response_cache = TTLCache(maxsize=256, ttl=60)
+        # ETag + last payload per request, kept past response-cache expiry:
+        # a conditional refresh that comes back 304 revalidates the stale
+        # payload without downloading or re-parsing the body
+        self._validator_cache = TTLCache(maxsize=256, ttl=3600)
 
     def _rate_limit(self):
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        if time_since_last_request < self.min_request_interval:
-            time.sleep(self.min_request_interval - time_since_last_request)
-        self.last_request_time = time.time()
+        COINGECKO_BUCKET.acquire()
 
     def _make_request(self, endpoint, params=None):
+        cache_key = (endpoint, tuple(sorted(params.items())) if params else None)
+        cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         self._rate_limit()
         url = f"{self.base_url}/{endpoint}"
+        headers = None
+        stale = self._validator_cache.get(cache_key)
+        if stale is not None:
+            headers = {'If-None-Match': stale[0]}
         try:
-            response = self.session.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, headers=headers, timeout=10)
+            if response.status_code == 304 and stale is not None:
+                data = stale[1]
+                self._response_cache[cache_key] = data
+                return data
             response.raise_for_status()
-            return response.json()
+            data = response.json()
+            self._response_cache[cache_key] = data
+            etag = response.headers.get('ETag')
+            if etag:
+                self._validator_cache[cache_key] = (etag, data)
+            return data
         except requests.exceptions.RequestException as e:
-            print(f"CoinGecko API error: {e}")
+            logger.error("CoinGecko API error: %s", e)
             return None
 
     def _find_coin_id(self, symbol):
-        """Try to find coin ID by searching if not in mapping"""
+        """Try to find coin ID by searching if not in mapping (memoized)"""
+        cached = _COIN_ID_CACHE.get(symbol)
+        if cached is not None:
+            return cached
+
         coin_id = get_coingecko_id(symbol)
         # If it's just lowercase symbol, try to search for it
         if coin_id == symbol.lower():
@@ -42,9 +77,13 @@ class CoinGeckoService:
                 for result in search_results:
                     result_symbol = result.get('symbol', '').upper()
                     if result_symbol == symbol_upper:
-                        return result.get('id', coin_id)
-                # If no exact match, return first result
-                return search_results[0].get('id', coin_id)
+                        coin_id = result.get('id', coin_id)
+                        break
+                else:
+                    # If no exact match, use first result
+                    coin_id = search_results[0].get('id', coin_id)
+
+        _COIN_ID_CACHE[symbol] = coin_id
         return coin_id
 
     def get_current_price(self, symbol):
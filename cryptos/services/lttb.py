@@ -0,0 +1,44 @@
+import numpy as np
+
+
+def lttb_indices(values, threshold):
+    """Indices kept by Largest-Triangle-Three-Buckets downsampling.
+
+    Picks, per bucket, the point forming the largest triangle with the
+    previously kept point and the next bucket's average, which preserves
+    the visual shape of a line far better than uniform striding. Returns
+    an int64 index array (first and last points always kept) so callers
+    can apply one selection to several parallel series; when the input
+    already fits under threshold, the identity range comes back.
+    """
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    y = np.asarray(values, dtype=np.float64)
+    x = np.arange(n, dtype=np.float64)
+
+    # Bucket edges over the interior points; first and last stand alone
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    out = np.empty(threshold, dtype=np.int64)
+    out[0] = 0
+    out[threshold - 1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        lo = edges[i]
+        hi = edges[i + 1]
+        if i + 2 < threshold - 1:
+            nxt = slice(edges[i + 1], edges[i + 2])
+        else:
+            nxt = slice(edges[i + 1], n)
+        avg_x = x[nxt].mean()
+        avg_y = y[nxt].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
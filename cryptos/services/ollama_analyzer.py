@@ -1,8 +1,80 @@
+from collections import OrderedDict
 from django.conf import settings
-from ollama import Client
+import hashlib
 import json
+import logging
 import re
 import os
+import time
+
+from .ollama_service import OLLAMA_TIMEOUT, _normalize_ollama_url, get_shared_client
+
+logger = logging.getLogger(__name__)
+
+# Hot-path patterns compiled once at import
+_JSON_RE = re.compile(r'\{[^{}]*"recommendation"[^{}]*\}', re.DOTALL)
+_CONF_RE = re.compile(r'confidence[:\s]+(\d+)', re.IGNORECASE)
+
+# The prompt is a pure function of (model, symbol, price, indicators), so
+# identical inputs within the TTL can reuse the previous LLM response
+_RESPONSE_CACHE_MAX = 256
+_RESPONSE_CACHE_TTL = 300.0
+
+# Everything that is identical across calls lives in the system prompt, so
+# the server can reuse its precomputed prefix KV state between requests;
+# only the per-symbol indicator block travels in the user prompt
+ANALYSIS_SYSTEM_PROMPT = """You are an expert cryptocurrency technical analyst with 20+ years of experience. Analyze the technical indicators provided by the user and provide a trading recommendation.
+
+ANALYSIS RULES:
+1. BUY recommendation requires:
+   - RSI < 40 (oversold territory) OR
+   - MACD bullish crossover (MACD > Signal) with positive histogram OR
+   - Price below lower Bollinger Band (oversold) OR
+   - Strong bullish trend (SMA 20 > SMA 50, ADX > 25)
+   - At least 2 of the above conditions must be met
+
+2. SELL recommendation requires:
+   - RSI > 60 (overbought territory) OR
+   - MACD bearish crossover (MACD < Signal) with negative histogram OR
+   - Price above upper Bollinger Band (overbought) OR
+   - Strong bearish trend (SMA 20 < SMA 50, ADX > 25)
+   - At least 2 of the above conditions must be met
+
+3. HOLD recommendation when:
+   - Mixed signals or neutral indicators
+   - No clear trend direction
+   - Waiting for confirmation
+
+4. Confidence Score Guidelines:
+   - 80-100: Very strong signal, multiple indicators align
+   - 60-79: Strong signal, 2-3 indicators align
+   - 40-59: Moderate signal, some indicators align
+   - 20-39: Weak signal, conflicting indicators
+   - 0-19: Very weak or no clear signal
+
+Based on the technical indicators, provide:
+1. A clear recommendation: BUY, SELL, or HOLD
+2. A confidence score from 0 to 100
+3. A detailed reasoning explaining your decision based on the technical indicators
+
+Format your response as JSON with the following structure:
+{
+    "recommendation": "BUY|SELL|HOLD",
+    "confidence_score": <number between 0 and 100>,
+    "reasoning": "<detailed explanation of your analysis, mentioning specific indicator values and why they support your recommendation>"
+}
+
+Be specific about which indicators support your recommendation. Consider:
+- RSI levels (oversold <30, overbought >70)
+- MACD crossovers and histogram
+- Moving average relationships
+- Bollinger Band position
+- Stochastic oscillator levels
+- ADX trend strength
+- Volume patterns
+- Support and resistance levels
+
+Respond ONLY with valid JSON, no additional text."""
 
 
 class OllamaAnalyzer:
@@ -10,25 +82,17 @@ class OllamaAnalyzer:
         # Use provided values or fallback to settings
         self.base_url = base_url or getattr(settings, 'OLLAMA_BASE_URL', 'http://localhost:11434')
         self.model = model or getattr(settings, 'OLLAMA_MODEL', 'plutus')
+        self._response_cache = OrderedDict()
         self._setup_client()
     
     def _setup_client(self):
-        """Setup Ollama client with proper URL"""
-        # Normalize URL
-        url = self.base_url.strip()
-        if not url.startswith('http://') and not url.startswith('https://'):
-            url = f'https://{url}'
-        
-        # Remove trailing slash
-        url = url.rstrip('/')
-        
-        # Create client with explicit host
+        """Bind the shared per-host client for the configured URL"""
         try:
-            self.client = Client(host=url)
+            self.client = get_shared_client(_normalize_ollama_url(self.base_url))
         except Exception as e:
-            print(f"Warning: Could not create Ollama client: {e}")
+            logger.warning("Could not create Ollama client: %s", e)
             # Fallback to default
-            self.client = Client()
+            self.client = get_shared_client('')
     
     def update_config(self, base_url=None, model=None):
         """Update Ollama configuration"""
@@ -40,30 +104,30 @@ class OllamaAnalyzer:
 
     def _format_indicators_for_prompt(self, indicators: dict, crypto_symbol: str, current_price: float) -> str:
         """Format technical indicators into a readable string for the LLM"""
-        prompt_data = f"""
+        parts = [f"""
 CRYPTO: {crypto_symbol}
 CURRENT PRICE: ${current_price:.2f}
 
 TECHNICAL INDICATORS:
-"""
+"""]
         if indicators.get('rsi') is not None:
             rsi = indicators['rsi']
             rsi_status = "OVERSOLD" if rsi < 30 else "OVERBOUGHT" if rsi > 70 else "NEUTRAL"
-            prompt_data += f"- RSI (14): {rsi:.2f} ({rsi_status})\n"
-        
+            parts.append(f"- RSI (14): {rsi:.2f} ({rsi_status})\n")
+
         if indicators.get('macd') is not None and indicators.get('macd_signal') is not None:
             macd = indicators['macd']
             signal = indicators['macd_signal']
             histogram = indicators.get('macd_histogram', 0)
             macd_trend = "BULLISH" if macd > signal else "BEARISH"
-            prompt_data += f"- MACD: {macd:.4f}, Signal: {signal:.4f}, Histogram: {histogram:.4f} ({macd_trend})\n"
-        
+            parts.append(f"- MACD: {macd:.4f}, Signal: {signal:.4f}, Histogram: {histogram:.4f} ({macd_trend})\n")
+
         if indicators.get('sma_20') is not None and indicators.get('sma_50') is not None:
             sma20 = indicators['sma_20']
             sma50 = indicators['sma_50']
             ma_trend = "BULLISH" if sma20 > sma50 else "BEARISH"
-            prompt_data += f"- SMA 20: ${sma20:.2f}, SMA 50: ${sma50:.2f} ({ma_trend})\n"
-        
+            parts.append(f"- SMA 20: ${sma20:.2f}, SMA 50: ${sma50:.2f} ({ma_trend})\n")
+
         if indicators.get('bb_upper') is not None and indicators.get('bb_lower') is not None:
             bb_upper = indicators['bb_upper']
             bb_lower = indicators['bb_lower']
@@ -74,123 +138,119 @@ TECHNICAL INDICATORS:
                 bb_position = "BELOW LOWER BAND (Oversold)"
             else:
                 bb_position = "WITHIN BANDS"
-            prompt_data += f"- Bollinger Bands: Upper ${bb_upper:.2f}, Middle ${bb_middle:.2f}, Lower ${bb_lower:.2f} - Price is {bb_position}\n"
-        
+            parts.append(f"- Bollinger Bands: Upper ${bb_upper:.2f}, Middle ${bb_middle:.2f}, Lower ${bb_lower:.2f} - Price is {bb_position}\n")
+
         if indicators.get('stoch_k') is not None and indicators.get('stoch_d') is not None:
             stoch_k = indicators['stoch_k']
             stoch_d = indicators['stoch_d']
             stoch_signal = "OVERSOLD" if stoch_k < 20 else "OVERBOUGHT" if stoch_k > 80 else "NEUTRAL"
-            prompt_data += f"- Stochastic: K={stoch_k:.2f}, D={stoch_d:.2f} ({stoch_signal})\n"
-        
+            parts.append(f"- Stochastic: K={stoch_k:.2f}, D={stoch_d:.2f} ({stoch_signal})\n")
+
         if indicators.get('adx') is not None:
             adx = indicators['adx']
             trend_strength = "STRONG" if adx > 25 else "WEAK" if adx < 20 else "MODERATE"
-            prompt_data += f"- ADX: {adx:.2f} (Trend Strength: {trend_strength})\n"
-        
+            parts.append(f"- ADX: {adx:.2f} (Trend Strength: {trend_strength})\n")
+
         if indicators.get('volume_ratio') is not None:
             vol_ratio = indicators['volume_ratio']
             vol_status = "HIGH" if vol_ratio > 1.5 else "LOW" if vol_ratio < 0.5 else "NORMAL"
-            prompt_data += f"- Volume Ratio: {vol_ratio:.2f}x ({vol_status} volume)\n"
-        
+            parts.append(f"- Volume Ratio: {vol_ratio:.2f}x ({vol_status} volume)\n")
+
         if indicators.get('support') is not None and indicators.get('resistance') is not None:
             support = indicators['support']
             resistance = indicators['resistance']
-            prompt_data += f"- Support Level: ${support:.2f}\n"
-            prompt_data += f"- Resistance Level: ${resistance:.2f}\n"
-        
-        return prompt_data
+            parts.append(f"- Support Level: ${support:.2f}\n")
+            parts.append(f"- Resistance Level: ${resistance:.2f}\n")
 
-    def _create_analysis_prompt(self, indicators: dict, crypto_symbol: str, current_price: float) -> str:
-        """Create the prompt for technical analysis"""
-        indicators_text = self._format_indicators_for_prompt(indicators, crypto_symbol, current_price)
-        
-        prompt = f"""You are an expert cryptocurrency technical analyst with 20+ years of experience. Analyze the following technical indicators for {crypto_symbol} and provide a trading recommendation.
-
-{indicators_text}
-
-ANALYSIS RULES:
-1. BUY recommendation requires:
-   - RSI < 40 (oversold territory) OR
-   - MACD bullish crossover (MACD > Signal) with positive histogram OR
-   - Price below lower Bollinger Band (oversold) OR
-   - Strong bullish trend (SMA 20 > SMA 50, ADX > 25)
-   - At least 2 of the above conditions must be met
+        return ''.join(parts)
 
-2. SELL recommendation requires:
-   - RSI > 60 (overbought territory) OR
-   - MACD bearish crossover (MACD < Signal) with negative histogram OR
-   - Price above upper Bollinger Band (overbought) OR
-   - Strong bearish trend (SMA 20 < SMA 50, ADX > 25)
-   - At least 2 of the above conditions must be met
-
-3. HOLD recommendation when:
-   - Mixed signals or neutral indicators
-   - No clear trend direction
-   - Waiting for confirmation
+    def _create_analysis_prompt(self, indicators: dict, crypto_symbol: str, current_price: float) -> str:
+        """Create the dynamic (per-call) part of the analysis prompt.
 
-4. Confidence Score Guidelines:
-   - 80-100: Very strong signal, multiple indicators align
-   - 60-79: Strong signal, 2-3 indicators align
-   - 40-59: Moderate signal, some indicators align
-   - 20-39: Weak signal, conflicting indicators
-   - 0-19: Very weak or no clear signal
+        The static persona/rules/schema boilerplate is sent separately as
+        the system prompt (ANALYSIS_SYSTEM_PROMPT) so it stays a stable
+        prefix the server can cache.
+        """
+        indicators_text = self._format_indicators_for_prompt(indicators, crypto_symbol, current_price)
+        return f"{indicators_text}\nNow analyze and respond with the JSON object."
 
-Based on these technical indicators, provide:
-1. A clear recommendation: BUY, SELL, or HOLD
-2. A confidence score from 0 to 100
-3. A detailed reasoning explaining your decision based on the technical indicators
+    @staticmethod
+    def _canonicalize(indicators: dict, current_price: float) -> dict:
+        """Snap indicator values to decision-relevant buckets.
 
-Format your response as JSON with the following structure:
-{{
-    "recommendation": "BUY|SELL|HOLD",
-    "confidence_score": <number between 0 and 100>,
-    "reasoning": "<detailed explanation of your analysis, mentioning specific indicator values and why they support your recommendation>"
-}}
-
-Be specific about which indicators support your recommendation. Consider:
-- RSI levels (oversold <30, overbought >70)
-- MACD crossovers and histogram
-- Moving average relationships
-- Bollinger Band position
-- Stochastic oscillator levels
-- ADX trend strength
-- Volume patterns
-- Support and resistance levels
+        Float noise below what would change the analysis (a 7th-decimal
+        RSI wiggle) should land on the same cache entry, so each value is
+        rounded to the granularity the prompt and rules actually use.
+        """
+        canon = {}
+        for key, value in indicators.items():
+            if not isinstance(value, (int, float)):
+                continue
+            if key == 'rsi' or key.startswith('stoch'):
+                canon[key] = round(value * 2) / 2
+            elif key == 'adx':
+                canon[key] = round(value)
+            elif key == 'volume_ratio':
+                canon[key] = round(value, 1)
+            elif key.startswith('macd'):
+                canon[key] = round(value, 4)
+            else:
+                canon[key] = round(value, 2)
+        # Band position is what the prompt reports, not the raw bounds
+        bb_upper = indicators.get('bb_upper')
+        bb_lower = indicators.get('bb_lower')
+        if isinstance(bb_upper, (int, float)) and isinstance(bb_lower, (int, float)):
+            if current_price > bb_upper:
+                canon['bb_position'] = 'above'
+            elif current_price < bb_lower:
+                canon['bb_position'] = 'below'
+            else:
+                canon['bb_position'] = 'within'
+        return canon
 
-Respond ONLY with valid JSON, no additional text."""
-        
-        return prompt
+    def _cache_key(self, indicators: dict, crypto_symbol: str, current_price: float) -> str:
+        """Deterministic digest of everything that shapes the prompt"""
+        payload = {
+            'm': self.model,
+            's': crypto_symbol,
+            'p': round(current_price, 2),
+            'i': self._canonicalize(indicators, current_price),
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
 
     def analyze_with_ollama(self, indicators: dict, crypto_symbol: str, current_price: float) -> dict:
         """Analyze technical indicators using Ollama LLM"""
+        cache_key = self._cache_key(indicators, crypto_symbol, current_price)
+        entry = self._response_cache.get(cache_key)
+        if entry is not None and entry[1] > time.monotonic():
+            self._response_cache.move_to_end(cache_key)
+            return dict(entry[0])
+
         try:
             prompt = self._create_analysis_prompt(indicators, crypto_symbol, current_price)
-            
-            # Use client.generate instead of ollama.generate
-            response = self.client.generate(
-                model=self.model,
-                prompt=prompt
-            )
-            
-            # Extract the response text - client returns GenerateResponse object
-            if hasattr(response, 'response'):
-                response_text = response.response
-            elif isinstance(response, dict):
-                response_text = response.get('response', '')
-            else:
-                response_text = str(response)
-            
-            # Try to parse JSON from response
-            json_match = re.search(r'\{[^{}]*"recommendation"[^{}]*\}', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
+
+            response_text = self._generate_streaming(prompt)
+
+            # Fast path: well-formed JSON responses (the common case with
+            # format='json') parse directly without touching the regex
+            result = None
+            if response_text.find('"recommendation"') != -1:
                 try:
-                    result = json.loads(json_str)
+                    parsed = json.loads(response_text)
+                    if isinstance(parsed, dict):
+                        result = parsed
                 except json.JSONDecodeError:
-                    # Fallback parsing
+                    pass
+            if result is None:
+                json_match = _JSON_RE.search(response_text)
+                if json_match:
+                    try:
+                        result = json.loads(json_match.group(0))
+                    except json.JSONDecodeError:
+                        # Fallback parsing
+                        result = self._parse_response_fallback(response_text)
+                else:
                     result = self._parse_response_fallback(response_text)
-            else:
-                result = self._parse_response_fallback(response_text)
             
             # Normalize recommendation
             recommendation = result.get('recommendation', 'HOLD').upper()
@@ -202,14 +262,20 @@ Respond ONLY with valid JSON, no additional text."""
             confidence = max(0, min(100, confidence))
             
             reasoning = result.get('reasoning', response_text)
-            
-            return {
+
+            analysis = {
                 'recommendation': recommendation.lower(),
                 'confidence_score': confidence,
                 'reasoning': reasoning,
                 'raw_response': response_text
             }
-            
+            # Only successful analyses are cached; error fallbacks below
+            # should retry on the next call
+            self._response_cache[cache_key] = (dict(analysis), time.monotonic() + _RESPONSE_CACHE_TTL)
+            while len(self._response_cache) > _RESPONSE_CACHE_MAX:
+                self._response_cache.popitem(last=False)
+            return analysis
+
         except Exception as e:
             # Log error but don't print to console in production
             error_msg = str(e)
@@ -230,6 +296,57 @@ Respond ONLY with valid JSON, no additional text."""
                     'raw_response': ''
                 }
 
+    def _generate_streaming(self, prompt: str) -> str:
+        """Stream the completion and stop once the top-level JSON object closes"""
+        parts = []
+        depth = 0
+        seen_open = False
+        in_string = False
+        escaped = False
+        stream = self.client.generate(
+            model=self.model,
+            system=ANALYSIS_SYSTEM_PROMPT,
+            prompt=prompt,
+            stream=True,
+            format='json',
+            options={'num_predict': 512}
+        )
+        for chunk in stream:
+            # Chunks are GenerateResponse objects or plain dicts
+            if hasattr(chunk, 'response'):
+                piece = chunk.response or ''
+                done = getattr(chunk, 'done', False)
+            elif isinstance(chunk, dict):
+                piece = chunk.get('response', '')
+                done = chunk.get('done', False)
+            else:
+                piece = str(chunk)
+                done = False
+            if piece:
+                parts.append(piece)
+                # Braces inside string values (e.g. in the reasoning text)
+                # must not move the depth, so track string/escape state
+                # across chunk boundaries and only count structural braces
+                for char in piece:
+                    if escaped:
+                        escaped = False
+                    elif char == '\\':
+                        escaped = in_string
+                    elif char == '"':
+                        in_string = not in_string
+                    elif not in_string:
+                        if char == '{':
+                            depth += 1
+                            seen_open = True
+                        elif char == '}':
+                            depth -= 1
+                # Stop as soon as the outermost object is balanced
+                if seen_open and depth <= 0:
+                    break
+            if done:
+                break
+        return ''.join(parts)
+
     def _parse_response_fallback(self, response_text: str) -> dict:
         """Fallback parser for non-JSON responses"""
         result = {
@@ -245,7 +362,7 @@ Respond ONLY with valid JSON, no additional text."""
             result['recommendation'] = 'SELL'
         
         # Try to extract confidence score
-        confidence_match = re.search(r'confidence[:\s]+(\d+)', response_text, re.IGNORECASE)
+        confidence_match = _CONF_RE.search(response_text)
         if confidence_match:
             result['confidence_score'] = int(confidence_match.group(1))
         
@@ -1,40 +1,110 @@
+from functools import lru_cache
+import logging
 import ollama
 from ollama import Client
 import os
+import time
 from typing import List, Dict
 from django.conf import settings
 
+from .ttl_cache import TTLCache
+
+# Bound every Ollama call so a hung server can't stall callers forever
+OLLAMA_TIMEOUT = 120.0
+OLLAMA_RETRIES = 3
+
+logger = logging.getLogger(__name__)
+
+# The model list changes rarely but is fetched on every Settings render;
+# cache it per host for a short window
+_MODELS_CACHE = TTLCache(maxsize=16, ttl=30)
+
+
+def _extract_model_obj(model):
+    """Model object from the ollama library ('model' or 'name' attribute)"""
+    name = getattr(model, 'model', None) or getattr(model, 'name', '')
+    return {
+        'name': name,
+        'size': getattr(model, 'size', 0),
+        'modified_at': getattr(model, 'modified_at', ''),
+    }
+
+
+def _extract_model_dict(model):
+    """Plain dict from a raw API response"""
+    return {
+        'name': model.get('model') or model.get('name', ''),
+        'size': model.get('size', 0),
+        'modified_at': model.get('modified_at', ''),
+    }
+
+
+@lru_cache(maxsize=32)
+def _normalize_ollama_url(url: str) -> str:
+    """Canonical host string for client sharing: scheme added, slash trimmed.
+
+    Memoized because the same configured URL is re-normalized on every
+    service/analyzer instantiation, i.e. on every request.
+    """
+    url = url.strip()
+    if not url.startswith('http://') and not url.startswith('https://'):
+        url = f'https://{url}'
+    return url.rstrip('/')
+
+
+@lru_cache(maxsize=16)
+def get_shared_client(host: str) -> Client:
+    """One Client (and underlying keep-alive connection pool) per host.
+
+    Views construct analyzer/service instances per request; sharing the
+    client avoids a fresh TCP/TLS handshake for every call.
+    """
+    if host:
+        return Client(host=host, timeout=OLLAMA_TIMEOUT)
+    return Client(timeout=OLLAMA_TIMEOUT)
+
 
 class OllamaService:
     """Service to interact with Ollama API"""
-    
+
     def __init__(self, base_url=None):
         self.base_url = base_url or getattr(settings, 'OLLAMA_BASE_URL', 'http://localhost:11434')
         self._setup_client()
-    
+
     def _setup_client(self):
-        """Setup Ollama client with proper URL"""
-        # Normalize URL
-        url = self.base_url.strip()
-        if not url.startswith('http://') and not url.startswith('https://'):
-            url = f'https://{url}'
-        
-        # Remove trailing slash
-        url = url.rstrip('/')
-        
-        # Create client with explicit host
+        """Bind the shared per-host client for the configured URL"""
         try:
-            self.client = Client(host=url)
+            self.client = get_shared_client(_normalize_ollama_url(self.base_url))
         except Exception as e:
-            print(f"Warning: Could not create Ollama client: {e}")
+            logger.warning("Could not create Ollama client: %s", e)
             # Fallback to default
-            self.client = Client()
-    
+            self.client = get_shared_client('')
+
+    def _call_with_retries(self, func, *args, **kwargs):
+        """Retry transient connection failures with a short backoff"""
+        last_error = None
+        for attempt in range(OLLAMA_RETRIES):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                last_error = e
+                error_msg = str(e)
+                if '10061' not in error_msg and 'connection' not in error_msg.lower() and 'timed out' not in error_msg.lower():
+                    raise
+                # No retry follows the last attempt, so don't pay its backoff
+                if attempt < OLLAMA_RETRIES - 1:
+                    time.sleep(0.5 * (2 ** attempt))
+        raise last_error
+
     def list_models(self) -> List[Dict]:
-        """List all available models from Ollama"""
+        """List all available models from Ollama (cached per host)"""
+        cached = _MODELS_CACHE.get(self.base_url)
+        if cached is not None:
+            return list(cached)
+
         try:
-            response = self.client.list()
-            
+            response = self._call_with_retries(self.client.list)
+
             # Handle different response formats
             if hasattr(response, 'models'):
                 model_list = response.models
@@ -44,39 +114,19 @@ class OllamaService:
                 model_list = response
             else:
                 model_list = []
-            
+
             result = []
-            for model in model_list:
-                # Handle Model objects from ollama library
-                if hasattr(model, 'model'):
-                    model_name = model.model
-                    model_info = {
-                        'name': model_name,
-                        'size': getattr(model, 'size', 0),
-                        'modified_at': getattr(model, 'modified_at', ''),
-                    }
-                elif hasattr(model, 'name'):
-                    model_name = model.name
-                    model_info = {
-                        'name': model_name,
-                        'size': getattr(model, 'size', 0),
-                        'modified_at': getattr(model, 'modified_at', ''),
-                    }
-                elif isinstance(model, dict):
-                    # Handle dict format (from API responses)
-                    model_name = model.get('model') or model.get('name', '')
-                    model_info = {
-                        'name': model_name,
-                        'size': model.get('size', 0),
-                        'modified_at': model.get('modified_at', ''),
-                    }
-                else:
-                    continue
-                
-                if model_info['name']:
-                    result.append(model_info)
-            
-            return result
+            if model_list:
+                # All entries share one shape; pick the extractor once
+                # instead of re-probing attributes per item
+                extract = (
+                    _extract_model_dict if isinstance(model_list[0], dict)
+                    else _extract_model_obj
+                )
+                result = [info for info in map(extract, model_list) if info['name']]
+
+            _MODELS_CACHE[self.base_url] = result
+            return list(result)
         except Exception as e:
             # Don't print traceback for connection errors
             error_msg = str(e)
@@ -88,7 +138,7 @@ class OllamaService:
     def get_model_info(self, model_name: str) -> Dict:
         """Get information about a specific model"""
         try:
-            model_info = self.client.show(model_name)
+            model_info = self._call_with_retries(self.client.show, model_name)
             
             if hasattr(model_info, 'modelfile'):
                 return {
@@ -106,6 +156,6 @@ class OllamaService:
                 }
             return {}
         except Exception as e:
-            print(f"Error getting model info for {model_name}: {e}")
+            logger.error("Error getting model info for %s: %s", model_name, e)
             return {}
 
@@ -0,0 +1,31 @@
+from threading import Lock
+import time
+
+
+class TokenBucket:
+    """Token-bucket rate limiter; acquire() only blocks once the quota is spent"""
+
+    def __init__(self, rate, per, burst=None):
+        self.capacity = float(burst if burst is not None else rate)
+        self.refill_rate = rate / per
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.refill_rate
+            time.sleep(wait)
+
+
+# Shared across threads so concurrent fetch workers draw from one quota.
+# Binance allows ~20 req/s; CoinGecko's free tier is ~30 req/min.
+BINANCE_BUCKET = TokenBucket(rate=20, per=1, burst=10)
+COINGECKO_BUCKET = TokenBucket(rate=30, per=60, burst=5)
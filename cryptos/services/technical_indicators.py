@@ -1,164 +1,304 @@
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import Dict, List, Optional
 
 
+# Latest-values memo shared by all instances: dashboards poll the same
+# symbols repeatedly, so identical OHLCV frames recur between bar closes.
+# Keyed by frame length, last index value and a hash of the data tail.
+_LATEST_CACHE = {}
+_LATEST_CACHE_MAX = 512
+
+
+def _rolling_mean(arr: np.ndarray, period: int) -> np.ndarray:
+    """O(n) rolling mean over a float64 array via cumulative sums.
+
+    Matches pandas rolling(...).mean(): the first period-1 slots and any
+    window containing NaN come back as NaN.
+    """
+    n = arr.shape[0]
+    out = np.full(n, np.nan)
+    if n < period:
+        return out
+    nan_mask = np.isnan(arr)
+    csum = np.cumsum(np.where(nan_mask, 0.0, arr))
+    window_sum = csum[period - 1:].copy()
+    window_sum[1:] -= csum[:-period]
+    out[period - 1:] = window_sum / period
+    if nan_mask.any():
+        ncsum = np.cumsum(nan_mask)
+        win_nan = ncsum[period - 1:].copy()
+        win_nan[1:] -= ncsum[:-period]
+        out[period - 1:][win_nan > 0] = np.nan
+    return out
+
+
+def _rolling_mean_std(arr: np.ndarray, period: int):
+    """Rolling mean and sample std together from one pair of cumsums.
+
+    Matches rolling(period).mean() / .std() (ddof=1) without a second
+    pass over the data.
+    """
+    n = arr.shape[0]
+    mean = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    if n < period:
+        return mean, std
+    csum = np.cumsum(arr)
+    csum2 = np.cumsum(arr * arr)
+    s = csum[period - 1:].copy()
+    s[1:] -= csum[:-period]
+    s2 = csum2[period - 1:].copy()
+    s2[1:] -= csum2[:-period]
+    m = s / period
+    var = (s2 - period * m * m) / (period - 1)
+    mean[period - 1:] = m
+    std[period - 1:] = np.sqrt(np.maximum(var, 0.0))
+    return mean, std
+
+
+def _ema(arr: np.ndarray, span: int) -> np.ndarray:
+    """Exponential moving average via the direct recursion.
+
+    Equivalent to ewm(span=span, adjust=False).mean() without the pandas
+    window machinery; one multiply-add per bar.
+    """
+    out = np.empty_like(arr)
+    if arr.size == 0:
+        return out
+    alpha = 2.0 / (span + 1.0)
+    acc = arr[0]
+    out[0] = acc
+    for i in range(1, arr.size):
+        acc += alpha * (arr[i] - acc)
+        out[i] = acc
+    return out
+
+
+def _rolling_max(arr: np.ndarray, period: int) -> np.ndarray:
+    """Rolling max in one C-level pass over a strided window view"""
+    n = arr.shape[0]
+    out = np.full(n, np.nan)
+    if n >= period:
+        out[period - 1:] = np.max(sliding_window_view(arr, period), axis=1)
+    return out
+
+
+def _rolling_min(arr: np.ndarray, period: int) -> np.ndarray:
+    """Rolling min in one C-level pass over a strided window view"""
+    n = arr.shape[0]
+    out = np.full(n, np.nan)
+    if n >= period:
+        out[period - 1:] = np.min(sliding_window_view(arr, period), axis=1)
+    return out
+
+
 class TechnicalIndicators:
     def __init__(self, price_data: pd.DataFrame):
         """
         Initialize with price data DataFrame.
         Expected columns: timestamp, open, high, low, close, volume
+
+        The input is only ever read, so no defensive copy is taken: the
+        reindex/sort/fill steps below all produce cheap shallow frames
+        (or no new frame at all on the common pre-sorted path) and never
+        mutate the caller's DataFrame.
         """
-        self.df = price_data.copy()
-        if 'timestamp' in self.df.columns:
-            self.df.set_index('timestamp', inplace=True)
-        self.df.sort_index(inplace=True)
-        
+        df = price_data
+        if 'timestamp' in df.columns:
+            df = df.set_index('timestamp')
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+
         # Ensure we have the required columns
-        required_columns = ['open', 'high', 'low', 'close', 'volume']
-        for col in required_columns:
-            if col not in self.df.columns:
-                if col == 'open':
-                    self.df['open'] = self.df['close']
-                elif col == 'high':
-                    self.df['high'] = self.df['close']
-                elif col == 'low':
-                    self.df['low'] = self.df['close']
-                elif col == 'volume':
-                    self.df['volume'] = 0
+        missing = {
+            col: (df['close'] if col != 'volume' else 0)
+            for col in ('open', 'high', 'low', 'volume')
+            if col not in df.columns
+        }
+        if missing:
+            df = df.assign(**missing)
+        self.df = df
+        # Contiguous float64 copies of the price columns, materialized on
+        # first use; every kernel then works on the same flat arrays
+        # instead of re-extracting (and possibly re-casting) per call.
+        self._cols: Dict[str, np.ndarray] = {}
+
+    def _col(self, name: str) -> np.ndarray:
+        arr = self._cols.get(name)
+        if arr is None:
+            arr = np.ascontiguousarray(self.df[name].to_numpy(), dtype=np.float64)
+            self._cols[name] = arr
+        return arr
 
     def calculate_sma(self, period: int = 20) -> pd.Series:
         """Simple Moving Average"""
-        return self.df['close'].rolling(window=period).mean()
+        return pd.Series(_rolling_mean(self._col('close'), period), index=self.df.index)
 
     def calculate_ema(self, period: int = 20) -> pd.Series:
         """Exponential Moving Average"""
-        return self.df['close'].ewm(span=period, adjust=False).mean()
+        close = self._col('close')
+        return pd.Series(_ema(close, period), index=self.df.index)
 
     def calculate_rsi(self, period: int = 14) -> pd.Series:
-        """Relative Strength Index"""
-        delta = self.df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        """Relative Strength Index (single-pass numpy kernel)"""
+        close = self._col('close')
+        delta = np.empty_like(close)
+        delta[0] = np.nan
+        np.subtract(close[1:], close[:-1], out=delta[1:])
+        gain = _rolling_mean(np.where(delta > 0, delta, 0.0), period)
+        loss = _rolling_mean(np.where(delta < 0, -delta, 0.0), period)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = gain / loss
+            rsi = 100 - (100 / (1 + rs))
+        return pd.Series(rsi, index=self.df.index)
 
     def calculate_macd(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> Dict:
         """Moving Average Convergence Divergence"""
-        ema_fast = self.df['close'].ewm(span=fast_period, adjust=False).mean()
-        ema_slow = self.df['close'].ewm(span=slow_period, adjust=False).mean()
-        macd_line = ema_fast - ema_slow
-        signal_line = macd_line.ewm(span=signal_period, adjust=False).mean()
+        close = self._col('close')
+        macd_line = _ema(close, fast_period) - _ema(close, slow_period)
+        signal_line = _ema(macd_line, signal_period)
         histogram = macd_line - signal_line
-        
+
         return {
-            'macd': macd_line,
-            'signal': signal_line,
-            'histogram': histogram
+            'macd': pd.Series(macd_line, index=self.df.index),
+            'signal': pd.Series(signal_line, index=self.df.index),
+            'histogram': pd.Series(histogram, index=self.df.index)
         }
 
     def calculate_bollinger_bands(self, period: int = 20, std_dev: int = 2) -> Dict:
-        """Bollinger Bands"""
-        sma = self.calculate_sma(period)
-        std = self.df['close'].rolling(window=period).std()
-        upper_band = sma + (std * std_dev)
-        lower_band = sma - (std * std_dev)
-        
+        """Bollinger Bands (mean and std from one fused pass)"""
+        close = self._col('close')
+        mean, std = _rolling_mean_std(close, period)
+        spread = std * std_dev
+
         return {
-            'middle': sma,
-            'upper': upper_band,
-            'lower': lower_band
+            'middle': pd.Series(mean, index=self.df.index),
+            'upper': pd.Series(mean + spread, index=self.df.index),
+            'lower': pd.Series(mean - spread, index=self.df.index)
         }
 
     def calculate_stochastic(self, k_period: int = 14, d_period: int = 3) -> Dict:
-        """Stochastic Oscillator"""
-        low_min = self.df['low'].rolling(window=k_period).min()
-        high_max = self.df['high'].rolling(window=k_period).max()
-        k_percent = 100 * ((self.df['close'] - low_min) / (high_max - low_min))
-        d_percent = k_percent.rolling(window=d_period).mean()
-        
+        """Stochastic Oscillator (single-pass numpy kernels)"""
+        high = self._col('high')
+        low = self._col('low')
+        close = self._col('close')
+        low_min = _rolling_min(low, k_period)
+        high_max = _rolling_max(high, k_period)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k_percent = 100 * ((close - low_min) / (high_max - low_min))
+        d_percent = _rolling_mean(k_percent, d_period)
+
         return {
-            'k': k_percent,
-            'd': d_percent
+            'k': pd.Series(k_percent, index=self.df.index),
+            'd': pd.Series(d_percent, index=self.df.index)
         }
 
     def calculate_adx(self, period: int = 14) -> pd.Series:
-        """Average Directional Index"""
-        high_diff = self.df['high'].diff()
-        low_diff = -self.df['low'].diff()
-        
-        plus_dm = high_diff.where((high_diff > low_diff) & (high_diff > 0), 0)
-        minus_dm = low_diff.where((low_diff > high_diff) & (low_diff > 0), 0)
-        
-        tr = self._calculate_true_range()
-        atr = tr.rolling(window=period).mean()
-        
-        plus_di = 100 * (plus_dm.rolling(window=period).mean() / atr)
-        minus_di = 100 * (minus_dm.rolling(window=period).mean() / atr)
-        
-        dx = 100 * (abs(plus_di - minus_di) / (plus_di + minus_di))
-        adx = dx.rolling(window=period).mean()
-        
-        return adx
+        """Average Directional Index (single-pass numpy kernels)"""
+        high = self._col('high')
+        low = self._col('low')
+
+        high_diff = np.empty_like(high)
+        high_diff[0] = np.nan
+        np.subtract(high[1:], high[:-1], out=high_diff[1:])
+        low_diff = np.empty_like(low)
+        low_diff[0] = np.nan
+        np.subtract(low[:-1], low[1:], out=low_diff[1:])
+
+        plus_dm = np.where((high_diff > low_diff) & (high_diff > 0), high_diff, 0.0)
+        minus_dm = np.where((low_diff > high_diff) & (low_diff > 0), low_diff, 0.0)
+
+        tr = self._true_range_array()
+        atr = _rolling_mean(tr, period)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            plus_di = 100 * (_rolling_mean(plus_dm, period) / atr)
+            minus_di = 100 * (_rolling_mean(minus_dm, period) / atr)
+        # Flat stretches give denom == 0 with a zero numerator; substituting
+        # a unit denominator yields dx == 0 there instead of a 0/0 NaN that
+        # would poison the whole ADX window
+        denom = plus_di + minus_di
+        dx = 100.0 * np.abs(plus_di - minus_di) / np.where(denom > 0.0, denom, 1.0)
+        adx = _rolling_mean(dx, period)
+
+        return pd.Series(adx, index=self.df.index)
+
+    def _true_range_array(self) -> np.ndarray:
+        """True Range as one elementwise numpy max, no intermediate frame"""
+        high = self._col('high')
+        low = self._col('low')
+        close = self._col('close')
+
+        c_prev = np.empty_like(close)
+        c_prev[0] = np.nan
+        c_prev[1:] = close[:-1]
+
+        tr = np.maximum(high - low, np.maximum(np.abs(high - c_prev), np.abs(low - c_prev)))
+        # First bar has no previous close; fall back to the plain range
+        tr[0] = high[0] - low[0]
+        return tr
 
     def _calculate_true_range(self) -> pd.Series:
         """Calculate True Range"""
-        high_low = self.df['high'] - self.df['low']
-        high_close = abs(self.df['high'] - self.df['close'].shift())
-        low_close = abs(self.df['low'] - self.df['close'].shift())
-        
-        tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        return tr
+        return pd.Series(self._true_range_array(), index=self.df.index)
 
     def calculate_volume_indicators(self) -> Dict:
-        """Volume-based indicators"""
-        volume_sma = self.df['volume'].rolling(window=20).mean()
-        volume_ratio = self.df['volume'] / volume_sma
-        
-        # On Balance Volume
-        obv = (np.sign(self.df['close'].diff()) * self.df['volume']).fillna(0).cumsum()
-        
+        """Volume-based indicators (numpy kernels, no intermediate Series)"""
+        volume = self._col('volume')
+        close = self._col('close')
+
+        volume_sma = _rolling_mean(volume, 20)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_ratio = volume / volume_sma
+
+        # On Balance Volume: signed volume flows accumulated in one pass
+        flows = np.empty_like(volume)
+        flows[0] = 0.0
+        np.multiply(np.sign(np.diff(close)), volume[1:], out=flows[1:])
+        obv = np.cumsum(flows)
+
         return {
-            'volume_sma': volume_sma,
-            'volume_ratio': volume_ratio,
-            'obv': obv
+            'volume_sma': pd.Series(volume_sma, index=self.df.index),
+            'volume_ratio': pd.Series(volume_ratio, index=self.df.index),
+            'obv': pd.Series(obv, index=self.df.index)
         }
 
     def calculate_support_resistance(self, window: int = 20) -> Dict:
-        """Calculate Support and Resistance levels"""
-        recent_data = self.df.tail(window)
-        
-        # Find local maxima and minima
-        highs = recent_data['high']
-        lows = recent_data['low']
-        
-        resistance = highs.max()
-        support = lows.min()
-        
+        """Calculate Support and Resistance levels (numpy tail reads)"""
+        high = self._col('high')[-window:]
+        low = self._col('low')[-window:]
+        close_last = float(self._col('close')[-1])
+
+        high_last = float(high[-1])
+        low_last = float(low[-1])
+        resistance = float(np.max(high))
+        support = float(np.min(low))
+
         # Calculate pivot points
-        pivot = (recent_data['high'].iloc[-1] + recent_data['low'].iloc[-1] + recent_data['close'].iloc[-1]) / 3
-        r1 = 2 * pivot - recent_data['low'].iloc[-1]
-        s1 = 2 * pivot - recent_data['high'].iloc[-1]
-        r2 = pivot + (recent_data['high'].iloc[-1] - recent_data['low'].iloc[-1])
-        s2 = pivot - (recent_data['high'].iloc[-1] - recent_data['low'].iloc[-1])
-        
+        pivot = (high_last + low_last + close_last) / 3
+        day_range = high_last - low_last
+
         return {
             'support': support,
             'resistance': resistance,
             'pivot': pivot,
-            'r1': r1,
-            'r2': r2,
-            's1': s1,
-            's2': s2
+            'r1': 2 * pivot - low_last,
+            'r2': pivot + day_range,
+            's1': 2 * pivot - high_last,
+            's2': pivot - day_range
         }
 
     def calculate_all_indicators(self) -> Dict:
         """Calculate all technical indicators"""
         indicators = {}
-        
+
+        # Bollinger middle IS the 20-bar SMA, so one fused pass serves both
+        bb_data = self.calculate_bollinger_bands()
+
         # Moving Averages
-        indicators['sma_20'] = self.calculate_sma(20)
+        indicators['sma_20'] = bb_data['middle']
         indicators['sma_50'] = self.calculate_sma(50)
         indicators['ema_12'] = self.calculate_ema(12)
         indicators['ema_26'] = self.calculate_ema(26)
@@ -173,7 +313,6 @@ class TechnicalIndicators:
         indicators['macd_histogram'] = macd_data['histogram']
         
         # Bollinger Bands
-        bb_data = self.calculate_bollinger_bands()
         indicators['bb_upper'] = bb_data['upper']
         indicators['bb_middle'] = bb_data['middle']
         indicators['bb_lower'] = bb_data['lower']
@@ -200,22 +339,145 @@ class TechnicalIndicators:
         
         return indicators
 
-    def get_latest_values(self) -> Dict:
-        """Get the latest values of all indicators"""
-        all_indicators = self.calculate_all_indicators()
-        latest_values = {}
-        
-        for key, value in all_indicators.items():
-            if isinstance(value, pd.Series):
-                latest_values[key] = float(value.iloc[-1]) if not pd.isna(value.iloc[-1]) else None
-            elif isinstance(value, (int, float)):
-                latest_values[key] = float(value) if not pd.isna(value) else None
+    def calculate_all_latest(self) -> Dict:
+        """Latest value of every indicator in one fused pass over the arrays.
+
+        Rolling indicators only depend on a bounded tail of the series, so
+        they are computed on slices; EMA12/EMA26/MACD/signal share a single
+        forward recursion. No intermediate Series are allocated.
+        """
+        close = self._col('close')
+        high = self._col('high')
+        low = self._col('low')
+        volume = self._col('volume')
+        n = close.shape[0]
+
+        def tail_mean(arr, period):
+            return float(np.mean(arr[-period:])) if n >= period else None
+
+        latest = {
+            'sma_20': tail_mean(close, 20),
+            'sma_50': tail_mean(close, 50),
+        }
+
+        # One fused recursion covers both EMAs and the MACD signal line
+        a12, a26, a9 = 2.0 / 13.0, 2.0 / 27.0, 2.0 / 10.0
+        e12 = e26 = close[0]
+        signal = 0.0
+        for x in close[1:]:
+            e12 += a12 * (x - e12)
+            e26 += a26 * (x - e26)
+            signal += a9 * ((e12 - e26) - signal)
+        macd = e12 - e26
+        latest['ema_12'] = float(e12)
+        latest['ema_26'] = float(e26)
+        latest['macd'] = float(macd)
+        latest['macd_signal'] = float(signal)
+        latest['macd_histogram'] = float(macd - signal)
+
+        # RSI over the last 14 deltas (the very first delta counts as 0,
+        # matching the pandas where(delta > 0, 0) coercion)
+        if n >= 14:
+            delta = np.diff(close[-15:])
+            gain = float(np.sum(np.where(delta > 0, delta, 0.0))) / 14.0
+            loss = float(np.sum(np.where(delta < 0, -delta, 0.0))) / 14.0
+            if loss > 0:
+                latest['rsi'] = 100.0 - 100.0 / (1.0 + gain / loss)
             else:
-                latest_values[key] = value
-        
-        # Add current price
-        latest_values['current_price'] = float(self.df['close'].iloc[-1])
-        latest_values['current_volume'] = float(self.df['volume'].iloc[-1])
-        
-        return latest_values
+                latest['rsi'] = 100.0 if gain > 0 else None
+        else:
+            latest['rsi'] = None
+
+        # Bollinger bands from the last 20-bar mean and sample std
+        if n >= 20:
+            window = close[-20:]
+            mid = float(np.mean(window))
+            spread = 2.0 * float(np.std(window, ddof=1))
+            latest['bb_middle'] = mid
+            latest['bb_upper'] = mid + spread
+            latest['bb_lower'] = mid - spread
+        else:
+            latest['bb_middle'] = latest['bb_upper'] = latest['bb_lower'] = None
+
+        # Stochastic %K for the last three windows, %D as their mean
+        def stoch_k(end):
+            lo = float(np.min(low[end - 14:end]))
+            hi = float(np.max(high[end - 14:end]))
+            if hi == lo:
+                return None
+            return 100.0 * (close[end - 1] - lo) / (hi - lo)
+
+        latest['stoch_k'] = stoch_k(n) if n >= 14 else None
+        if n >= 16:
+            k_tail = [stoch_k(end) for end in (n - 2, n - 1, n)]
+            latest['stoch_d'] = (
+                sum(k_tail) / 3.0 if all(k is not None for k in k_tail) else None
+            )
+        else:
+            latest['stoch_d'] = None
+
+        # ADX only needs ~2 periods of warm-up ahead of the final window
+        m = min(n, 3 * 14)
+        h, l, c = high[-m:], low[-m:], close[-m:]
+        hd = np.empty_like(h)
+        hd[0] = np.nan
+        np.subtract(h[1:], h[:-1], out=hd[1:])
+        ld = np.empty_like(l)
+        ld[0] = np.nan
+        np.subtract(l[:-1], l[1:], out=ld[1:])
+        plus_dm = np.where((hd > ld) & (hd > 0), hd, 0.0)
+        minus_dm = np.where((ld > hd) & (ld > 0), ld, 0.0)
+        c_prev = np.empty_like(c)
+        c_prev[0] = np.nan
+        c_prev[1:] = c[:-1]
+        tr = np.maximum(h - l, np.maximum(np.abs(h - c_prev), np.abs(l - c_prev)))
+        tr[0] = h[0] - l[0]
+        atr = _rolling_mean(tr, 14)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            plus_di = 100 * (_rolling_mean(plus_dm, 14) / atr)
+            minus_di = 100 * (_rolling_mean(minus_dm, 14) / atr)
+        denom = plus_di + minus_di
+        dx = 100.0 * np.abs(plus_di - minus_di) / np.where(denom > 0.0, denom, 1.0)
+        adx = _rolling_mean(dx, 14)[-1]
+        latest['adx'] = float(adx) if not np.isnan(adx) else None
+
+        # Volume indicators: tail mean for the SMA, full reduction for OBV
+        vol_sma = tail_mean(volume, 20)
+        latest['volume_sma'] = vol_sma
+        latest['volume_ratio'] = (
+            float(volume[-1]) / vol_sma if vol_sma else None
+        )
+        latest['obv'] = float(np.sum(np.sign(np.diff(close)) * volume[1:])) if n > 1 else 0.0
+
+        # Support/resistance over the last 20 bars
+        latest['support'] = float(np.min(low[-20:]))
+        latest['resistance'] = float(np.max(high[-20:]))
+        latest['pivot'] = float((high[-1] + low[-1] + close[-1]) / 3.0)
+
+        latest['current_price'] = float(close[-1])
+        latest['current_volume'] = float(volume[-1])
+        return latest
+
+    def get_latest_values(self) -> Dict:
+        """Get the latest values of all indicators (memoized per data tail)"""
+        tail = slice(-64, None)
+        key = (
+            self.df.shape[0],
+            self.df.index[-1],
+            hash(
+                self._col('close')[tail].tobytes()
+                + self._col('high')[tail].tobytes()
+                + self._col('low')[tail].tobytes()
+                + self._col('volume')[tail].tobytes()
+            ),
+        )
+        cached = _LATEST_CACHE.get(key)
+        if cached is not None:
+            return dict(cached)
+
+        latest = self.calculate_all_latest()
+        if len(_LATEST_CACHE) >= _LATEST_CACHE_MAX:
+            _LATEST_CACHE.pop(next(iter(_LATEST_CACHE)))
+        _LATEST_CACHE[key] = dict(latest)
+        return latest
 
@@ -0,0 +1,29 @@
+from threading import RLock
+import time
+
+
+class TTLCache:
+    """Thread-safe TTL cache on a monotonic clock with bounded size"""
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = {}
+        self._lock = RLock()
+
+    def get(self, key):
+        with self._lock:
+            # Hit path first: one dict lookup, one deadline compare.
+            # Expired entries are left for size-based eviction to reap.
+            entry = self._data.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                return entry[0]
+            return None
+
+    def __setitem__(self, key, data):
+        with self._lock:
+            if len(self._data) >= self.maxsize and key not in self._data:
+                # Evict the entry closest to expiry
+                oldest = min(self._data, key=lambda k: self._data[k][1])
+                del self._data[oldest]
+            self._data[key] = (data, time.monotonic() + self.ttl)
@@ -23,10 +23,13 @@ urlpatterns = [
     path('<int:crypto_id>/edit/', views.crypto_edit, name='crypto_edit'),
     path('<int:crypto_id>/delete/', views.crypto_delete, name='crypto_delete'),
     path('<int:crypto_id>/analysis/', views.crypto_analysis, name='crypto_analysis'),
+    path('<int:crypto_id>/analysis/chart-data/', views.chart_data_json, name='chart_data_json'),
     path('analysis/overview/', views.analysis_overview, name='analysis_overview'),
     path('<int:crypto_id>/update-price/', views.update_price, name='update_price'),
     path('settings/', views.settings_view, name='settings'),
     path('settings/load-models/', views.load_models_ajax, name='load_models'),
     path('api/price/<str:symbol>/', views.get_price, name='get_price'),
+    path('<int:crypto_id>/analysis/submit/', views.submit_analysis, name='submit_analysis'),
+    path('api/analysis/<str:job_id>/', views.analysis_job_status, name='analysis_job_status'),
 ]
 
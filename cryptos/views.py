@@ -3,27 +3,262 @@ from django.contrib import messages
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.models import User
-from django.http import JsonResponse
+from django.db.models import OuterRef, Subquery
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.cache import cache_control
 from django.views.decorators.http import require_http_methods
-from django.utils.safestring import mark_safe
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
+import hashlib
 import json
+import logging
 from .models import Crypto, PriceHistory, TechnicalAnalysis, AppSettings
-from .services.api_manager import APIManager
+from .services.api_manager import api_manager
 from .services.technical_indicators import TechnicalIndicators
-from .services.ollama_analyzer import OllamaAnalyzer
 from .services.ollama_service import OllamaService
 from .services.background_tasks import BackgroundTaskManager
+from .services import analysis_worker
+from .services.lttb import lttb_indices
+from .services.ttl_cache import TTLCache
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from django.utils import timezone
 
+logger = logging.getLogger(__name__)
+
 
 def is_admin(user):
     """Check if user is admin/staff"""
     return user.is_authenticated and user.is_staff
 
 
+# Static copy for the indicator explainer cards; crypto_analysis merges in
+# the per-request values and colors so this text isn't rebuilt per render
+_INDICATOR_CARDS = {
+    'rsi': {
+        'name': 'RSI (Relative Strength Index)',
+        'scale': '0-100',
+        'explanation': 'Measures the speed and magnitude of price changes. Indicates overbought (>70) or oversold (<30) conditions.',
+        'interpretation': 'Oversold (<30): Potential buy signal. Overbought (>70): Potential sell signal. Neutral (30-70): No clear signal.',
+    },
+    'macd': {
+        'name': 'MACD (Moving Average Convergence Divergence)',
+        'scale': 'Positive/Negative',
+        'explanation': 'Shows the relationship between two moving averages. MACD crossing above Signal is bullish, below is bearish.',
+        'interpretation': 'MACD > Signal: Bullish trend. MACD < Signal: Bearish trend. Histogram shows momentum strength.',
+    },
+    'sma_20': {
+        'name': 'SMA 20 (Simple Moving Average - 20 periods)',
+        'scale': 'Price level',
+        'explanation': 'Average price over the last 20 periods. Price above SMA indicates uptrend, below indicates downtrend.',
+        'interpretation': 'Price > SMA: Bullish. Price < SMA: Bearish. Compare with SMA 50 for trend confirmation.',
+    },
+    'sma_50': {
+        'name': 'SMA 50 (Simple Moving Average - 50 periods)',
+        'scale': 'Price level',
+        'explanation': 'Average price over the last 50 periods. Longer-term trend indicator compared to SMA 20.',
+        'interpretation': 'SMA 20 > SMA 50: Bullish crossover. SMA 20 < SMA 50: Bearish crossover.',
+    },
+    'bb_upper': {
+        'name': 'Bollinger Bands',
+        'scale': 'Price levels (Upper/Middle/Lower)',
+        'explanation': 'Volatility bands around a moving average. Upper and lower bands represent standard deviations from the middle band.',
+        'interpretation': 'Price touches upper band: Overbought. Price touches lower band: Oversold. Narrow bands: Low volatility. Wide bands: High volatility.',
+    },
+    'stoch_k': {
+        'name': 'Stochastic Oscillator',
+        'scale': '0-100',
+        'explanation': 'Compares closing price to price range over a period. Measures momentum and identifies overbought/oversold conditions.',
+        'interpretation': 'K > 80: Overbought (sell signal). K < 20: Oversold (buy signal). K crosses above D: Bullish. K crosses below D: Bearish.',
+    },
+    'adx': {
+        'name': 'ADX (Average Directional Index)',
+        'scale': '0-100',
+        'explanation': 'Measures trend strength regardless of direction. Higher values indicate stronger trends.',
+        'interpretation': 'ADX > 25: Strong trend. ADX < 20: Weak or no trend. ADX 20-25: Moderate trend. Does not indicate direction, only strength.',
+    },
+    'volume_ratio': {
+        'name': 'Volume Ratio',
+        'scale': 'Multiplier (x)',
+        'explanation': 'Compares current volume to average volume. High volume confirms price movements.',
+        'interpretation': '> 1.5x: High volume (confirms trend). < 0.5x: Low volume (weak trend). 0.5-1.5x: Normal volume.',
+    },
+    'support': {
+        'name': 'Support & Resistance',
+        'scale': 'Price levels',
+        'explanation': 'Support is a price level where buying pressure is strong. Resistance is where selling pressure is strong.',
+        'interpretation': 'Price near support: Potential bounce up. Price near resistance: Potential pullback. Breakthrough indicates trend continuation.',
+    },
+}
+
+
+# Filled chart indicator series are a pure function of the price frame, so
+# revisits between bar closes reuse them; the key pins crypto, last bar and
+# frame length and the TTL is only a defensive bound
+_HISTORICAL_INDICATORS_CACHE = TTLCache(maxsize=128, ttl=300)
+
+
+# Shared default for empty chart series; a tuple is immutable so one
+# instance can back every key and still serializes as []
+_EMPTY_SERIES = ()
+
+# A canvas has ~1200 horizontal pixels; anything past this is invisible
+# and only slows serialization, transfer and Chart.js rendering
+_CHART_MAX_POINTS = 2000
+
+
+def _format_chart_timestamps(values):
+    """Chart time labels plus a parallel date column, vectorized.
+
+    Replaces the per-element hasattr/isinstance/strftime branch tree with
+    two C-level strftime calls; entries pandas cannot parse keep their
+    raw string form, matching the old per-element fallbacks. The columns
+    stay parallel lists (struct-of-arrays) rather than one dict per row,
+    so the JSON payload carries no repeated keys.
+    """
+    values = list(values)
+    ts = pd.to_datetime(pd.Index(values), errors='coerce')
+    labels_list = list(ts.strftime('%H:%M'))
+    dates_list = list(ts.strftime('%Y-%m-%d'))
+    bad = np.flatnonzero(ts.isna())
+    if bad.size:
+        # Both providers normalize timestamps to datetimes; anything landing
+        # here means a provider regression worth surfacing
+        logger.warning(
+            "chart timestamps: %d of %d values not parseable as datetimes",
+            bad.size, len(values)
+        )
+    for i in bad:
+        labels_list[i] = str(values[i])
+        dates_list[i] = ''
+    return labels_list, dates_list
+
+
+def _frame_from_historical(historical_data):
+    """OHLCV DataFrame from either provider's historical payload"""
+    if historical_data['source'] == 'binance':
+        # Binance klines arrive as a ready NumPy-backed DataFrame
+        return historical_data['data']
+    # Convert CoinGecko data to DataFrame column-wise: one float64 array
+    # serves all four OHLC columns (no per-row dicts, no pandas
+    # row->column inference)
+    prices = historical_data['data'].get('prices', [])
+    price_col = np.fromiter(
+        (p['price'] for p in prices), dtype=np.float64, count=len(prices)
+    )
+    return pd.DataFrame({
+        'timestamp': [p['timestamp'] for p in prices],
+        'open': price_col,
+        'high': price_col,
+        'low': price_col,
+        'close': price_col,
+        'volume': 0.0
+    })
+
+
+def _chart_indicator_series(crypto_id, df):
+    """Gap-filled moving average and Bollinger series for the chart.
+
+    Memoized per data snapshot so repeat visits between bar closes skip
+    the compute; a miss runs only the charted columns — one fused rolling
+    pass for sma_20 and the three bands, one more for sma_50 — not the
+    full indicator sweep.
+    """
+    ind_key = (crypto_id, str(df['timestamp'].iloc[-1]), len(df))
+    historical_indicators = _HISTORICAL_INDICATORS_CACHE.get(ind_key)
+    if historical_indicators is not None:
+        return historical_indicators
+
+    tech_indicators = TechnicalIndicators(df)
+    bb_series = tech_indicators.calculate_bollinger_bands()
+    chart_series = {
+        'sma_20': bb_series['middle'],
+        'sma_50': tech_indicators.calculate_sma(50),
+        'bb_upper': bb_series['upper'],
+        'bb_middle': bb_series['middle'],
+        'bb_lower': bb_series['lower'],
+    }
+    historical_indicators = {}
+
+    # Fill NaN gaps and convert to lists in vectorized passes:
+    # forward-fill via a running last-valid-index, then backfill
+    # the leading NaNs from the first valid value
+    for key, series in chart_series.items():
+        if series is None or len(series) == 0:
+            historical_indicators[key] = []
+            continue
+        arr = series.to_numpy(dtype=np.float64)
+        mask = np.isnan(arr)
+        if mask.all():
+            historical_indicators[key] = []
+            continue
+        if mask.any():
+            idx = np.where(~mask, np.arange(arr.shape[0]), 0)
+            np.maximum.accumulate(idx, out=idx)
+            arr = arr[idx]
+            first = int(np.argmax(~mask))
+            arr[:first] = arr[first]
+        historical_indicators[key] = arr.tolist()
+    _HISTORICAL_INDICATORS_CACHE[ind_key] = historical_indicators
+    return historical_indicators
+
+
+def _build_chart_data(crypto, historical_data):
+    """Chart payload as plain lists: labels/dates/prices plus indicator
+    series from provider history when available, stored ticks otherwise"""
+    chart_data = dict.fromkeys(
+        ('labels', 'dates', 'prices', 'sma_20', 'sma_50',
+         'bb_upper', 'bb_middle', 'bb_lower'),
+        _EMPTY_SERIES
+    )
+
+    if historical_data and 'data' in historical_data:
+        df = _frame_from_historical(historical_data)
+        if not df.empty:
+            labels_list, dates_list = _format_chart_timestamps(df['timestamp'])
+            chart_data['labels'] = labels_list
+            chart_data['dates'] = dates_list
+            chart_data['prices'] = df['close'].tolist()
+
+            # The producer already filled every gap in vectorized passes,
+            # so no per-element None filter is needed on the way out
+            historical_indicators = _chart_indicator_series(crypto.id, df)
+            if historical_indicators:
+                chart_data['sma_20'] = historical_indicators.get('sma_20', [])
+                chart_data['sma_50'] = historical_indicators.get('sma_50', [])
+                chart_data['bb_upper'] = historical_indicators.get('bb_upper', [])
+                chart_data['bb_middle'] = historical_indicators.get('bb_middle', [])
+                chart_data['bb_lower'] = historical_indicators.get('bb_lower', [])
+
+            # Long histories (hourly CoinGecko windows) carry more points
+            # than a canvas can show; downsample every column through one
+            # shared LTTB index selection so the series stay aligned
+            n_points = len(chart_data['prices'])
+            if n_points > _CHART_MAX_POINTS:
+                keep = lttb_indices(chart_data['prices'], _CHART_MAX_POINTS)
+                for key, series in chart_data.items():
+                    if len(series) == n_points:
+                        chart_data[key] = [series[j] for j in keep]
+    else:
+        # Stored ticks are only worth querying when no provider history
+        # came back. Two columns via values_list skip model construction,
+        # and the shared helper formats the whole timestamp column in
+        # vectorized passes
+        rows = PriceHistory.objects.filter(crypto=crypto).order_by(
+            'timestamp'
+        ).values_list('timestamp', 'price')[:100]
+        if rows:
+            timestamps, prices = zip(*rows)
+            labels_list, dates_list = _format_chart_timestamps(timestamps)
+            chart_data['labels'] = labels_list
+            chart_data['dates'] = dates_list
+            # One C-level cast for the Decimal column instead of a float()
+            # call per row
+            chart_data['prices'] = np.asarray(prices, dtype=np.float64).tolist()
+    return chart_data
+
+
 def login_view(request):
     """User login view"""
     if request.user.is_authenticated:
@@ -61,7 +296,12 @@ def logout_view(request):
 @user_passes_test(is_admin)
 def user_list(request):
     """List all users (admin only)"""
-    users = User.objects.all().order_by('username')
+    # Trim the row to the columns the table shows — notably skipping the
+    # password hash and date_joined
+    users = User.objects.only(
+        'id', 'username', 'email', 'is_staff', 'is_superuser',
+        'is_active', 'last_login'
+    ).order_by('username')
     return render(request, 'cryptos/user_list.html', {'users': users})
 
 
@@ -173,25 +413,28 @@ def user_delete(request, user_id):
 @login_required
 def crypto_list(request):
     """List all registered cryptocurrencies"""
-    cryptos = Crypto.objects.all()
-    
-    # Get current prices for all cryptos
-    api_manager = APIManager()
+    # Last stored price rides along as a subquery (one SQL query total)
+    # so a provider outage degrades to stale data instead of zeros
+    last_price_sq = PriceHistory.objects.filter(
+        crypto=OuterRef('pk')
+    ).order_by('-timestamp').values('price')[:1]
+    cryptos = Crypto.objects.only(
+        'id', 'symbol', 'name', 'amount', 'purchase_price'
+    ).annotate(last_price=Subquery(last_price_sq))
+
+    # Fetch all prices concurrently so the page waits for the slowest
+    # request rather than the sum of them
+    price_map = api_manager.get_current_prices(crypto.symbol for crypto in cryptos)
     crypto_list_data = []
     for crypto in cryptos:
-        try:
-            price_data = api_manager.get_current_price(crypto.symbol)
-            if price_data and price_data.get('price'):
-                current_price = Decimal(str(price_data['price']))
-                price_change_24h = float(price_data.get('change_24h', 0))
-            else:
-                current_price = Decimal('0')
-                price_change_24h = 0
-        except Exception as e:
-            print(f"Error fetching price for {crypto.symbol}: {e}")
-            current_price = Decimal('0')
+        price_data = price_map.get(crypto.symbol)
+        if price_data and price_data.get('price'):
+            current_price = Decimal(str(price_data['price']))
+            price_change_24h = float(price_data.get('change_24h', 0))
+        else:
+            current_price = crypto.last_price or Decimal('0')
             price_change_24h = 0
-        
+
         current_value = crypto.amount * current_price if current_price > 0 else Decimal('0')
         profit_loss = current_value - (crypto.amount * crypto.purchase_price) if crypto.purchase_price > 0 else Decimal('0')
         
@@ -280,14 +523,17 @@ def crypto_analysis(request, crypto_id):
     crypto = get_object_or_404(Crypto, id=crypto_id)
     app_settings = AppSettings.get_settings()
     
-    # Get current price
-    api_manager = APIManager()
-    price_data = api_manager.get_current_price(crypto.symbol)
+    # Current price and historical data are independent upstream calls;
+    # run them concurrently so the view waits for the slower one only
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        price_future = pool.submit(api_manager.get_current_price, crypto.symbol)
+        historical_future = pool.submit(
+            api_manager.get_historical_data, crypto.symbol, app_settings.historical_days
+        )
+        price_data = price_future.result()
+        historical_data = historical_future.result()
     current_price = float(price_data['price']) if price_data and price_data.get('price') else 0.0
     
-    # Get historical data
-    historical_data = api_manager.get_historical_data(crypto.symbol, days=app_settings.historical_days)
-    
     # Get latest analysis
     latest_analysis = TechnicalAnalysis.objects.filter(crypto=crypto).first()
     
@@ -315,358 +561,135 @@ def crypto_analysis(request, crypto_id):
     
     # Calculate technical indicators
     indicators_data = None
+    analysis_refreshing = False
+    has_chart = False
     if historical_data and 'data' in historical_data:
-        if historical_data['source'] == 'binance':
-            # Convert Binance klines to DataFrame
-            klines = historical_data['data']
-            df_data = []
-            for kline in klines:
-                df_data.append({
-                    'timestamp': kline['timestamp'],
-                    'open': kline['open'],
-                    'high': kline['high'],
-                    'low': kline['low'],
-                    'close': kline['close'],
-                    'volume': kline['volume']
-                })
-            df = pd.DataFrame(df_data)
-        else:
-            # Convert CoinGecko data to DataFrame
-            prices = historical_data['data'].get('prices', [])
-            df_data = []
-            for price_point in prices:
-                df_data.append({
-                    'timestamp': price_point['timestamp'],
-                    'open': price_point['price'],
-                    'high': price_point['price'],
-                    'low': price_point['price'],
-                    'close': price_point['price'],
-                    'volume': 0
-                })
-            df = pd.DataFrame(df_data)
-        
+        df = _frame_from_historical(historical_data)
+
         if not df.empty:
-            tech_indicators = TechnicalIndicators(df)
-            indicators_data = tech_indicators.get_latest_values()
-            
-            # Calculate historical indicators for chart
-            all_indicators_series = tech_indicators.calculate_all_indicators()
-            historical_indicators = {}
-            
-            # Convert Series to lists, handling NaN values and forward-filling to extend to today
-            for key in ['sma_20', 'sma_50', 'bb_upper', 'bb_middle', 'bb_lower']:
-                series = all_indicators_series.get(key, pd.Series())
-                if isinstance(series, pd.Series) and len(series) > 0:
-                    # Forward fill NaN values to extend indicators to the end
-                    series_filled = series.ffill().bfill()
-                    # Convert to list, using last valid value for any remaining NaN
-                    series_list = series_filled.tolist()
-                    # Ensure all values extend to the end - use last valid value if needed
-                    last_valid = None
-                    for i, val in enumerate(series_list):
-                        if pd.notna(val):
-                            last_valid = float(val)
-                        elif last_valid is not None:
-                            series_list[i] = last_valid
-                    historical_indicators[key] = [float(x) if pd.notna(x) else (last_valid if last_valid is not None else None) for x in series_list]
-                else:
-                    historical_indicators[key] = []
-            
+            has_chart = True
+            # With a fresh analysis on file, its stored snapshot already
+            # holds the latest values — skip the indicator compute entirely
+            if not should_update and latest_analysis and latest_analysis.indicators:
+                indicators_data = dict(latest_analysis.indicators)
+            else:
+                indicators_data = TechnicalIndicators(df).get_latest_values()
+
             # Add current price to indicators for comparison
             if indicators_data:
                 indicators_data['current_price'] = current_price
             
-            # Run Ollama analysis only if needed
+            # Run Ollama analysis only if needed. The LLM call takes
+            # seconds, so it runs on the worker pool and the page renders
+            # immediately with the last saved analysis; reloads while the
+            # job is pending reuse it instead of queueing another.
             if indicators_data and should_update:
-                try:
-                    ollama_analyzer = OllamaAnalyzer(
-                        base_url=app_settings.ollama_base_url,
-                        model=app_settings.ollama_model
-                    )
-                    analysis_result = ollama_analyzer.analyze_with_ollama(
-                        indicators_data,
-                        crypto.symbol,
-                        current_price
-                    )
-                    
-                    # Save or update analysis
-                    if latest_analysis:
-                        latest_analysis.indicators = indicators_data
-                        latest_analysis.recommendation = analysis_result['recommendation']
-                        latest_analysis.confidence_score = analysis_result['confidence_score']
-                        latest_analysis.ollama_reasoning = analysis_result['reasoning']
-                        latest_analysis.analysis_date = timezone.now()
-                        latest_analysis.save()
-                    else:
-                        latest_analysis = TechnicalAnalysis.objects.create(
-                            crypto=crypto,
-                            indicators=indicators_data,
-                            recommendation=analysis_result['recommendation'],
-                            confidence_score=analysis_result['confidence_score'],
-                            ollama_reasoning=analysis_result['reasoning']
-                        )
-                except Exception as e:
-                    # If Ollama fails, still save indicators but with default analysis
-                    if not latest_analysis:
-                        latest_analysis = TechnicalAnalysis.objects.create(
-                            crypto=crypto,
-                            indicators=indicators_data,
-                            recommendation='hold',
-                            confidence_score=0,
-                            ollama_reasoning=f'Ollama analysis unavailable: {str(e)}'
-                        )
+                analysis_worker.submit_unique(
+                    f'refresh:{crypto.id}',
+                    analysis_worker.refresh_analysis,
+                    crypto.id, indicators_data, current_price
+                )
+                analysis_refreshing = True
             elif indicators_data and latest_analysis:
-                # Update indicators but keep existing analysis
-                latest_analysis.indicators = indicators_data
-                latest_analysis.save(update_fields=['indicators'])
-    
-    # Get price history for chart
-    price_history = PriceHistory.objects.filter(crypto=crypto).order_by('timestamp')[:100]
-    
-    # Initialize historical_indicators if not set
-    if 'historical_indicators' not in locals():
-        historical_indicators = {}
-    
+                # Refresh stored indicators (keeping the existing analysis)
+                # only when the snapshot actually changed
+                new_hash = hashlib.sha1(
+                    json.dumps(indicators_data, sort_keys=True, default=str).encode()
+                ).hexdigest()
+                if new_hash != latest_analysis.indicators_hash:
+                    latest_analysis.indicators = indicators_data
+                    latest_analysis.indicators_hash = new_hash
+                    latest_analysis.save(update_fields=['indicators', 'indicators_hash'])
+
+    if not has_chart:
+        # No provider history: the chart endpoint falls back to stored
+        # ticks, so the card renders whenever any exist
+        has_chart = PriceHistory.objects.filter(crypto=crypto).exists()
+
     # Prepare indicator explanations and scales
     indicator_info = {}
     if indicators_data:
+        # Bind each indicator once; the dict literal below referenced some
+        # of these through half a dozen .get() calls apiece
+        rsi = indicators_data.get('rsi')
+        macd = indicators_data.get('macd')
+        macd_signal = indicators_data.get('macd_signal')
+        sma_20 = indicators_data.get('sma_20')
+        sma_50 = indicators_data.get('sma_50')
+        bb_upper = indicators_data.get('bb_upper')
+        bb_lower = indicators_data.get('bb_lower')
+        stoch_k = indicators_data.get('stoch_k')
+        adx = indicators_data.get('adx')
+        volume_ratio = indicators_data.get('volume_ratio')
+        support = indicators_data.get('support')
+        resistance = indicators_data.get('resistance')
+
+        # Static card copy lives in _INDICATOR_CARDS; only the per-request
+        # values and signal colors are assembled here
         indicator_info = {
             'rsi': {
-                'name': 'RSI (Relative Strength Index)',
-                'value': indicators_data.get('rsi'),
-                'scale': '0-100',
-                'explanation': 'Measures the speed and magnitude of price changes. Indicates overbought (>70) or oversold (<30) conditions.',
-                'interpretation': 'Oversold (<30): Potential buy signal. Overbought (>70): Potential sell signal. Neutral (30-70): No clear signal.',
-                'color': 'success' if (indicators_data.get('rsi') is not None and indicators_data.get('rsi') < 30) else 'danger' if (indicators_data.get('rsi') is not None and indicators_data.get('rsi') > 70) else 'muted'
+                **_INDICATOR_CARDS['rsi'],
+                'value': rsi,
+                'color': 'muted' if rsi is None else 'success' if rsi < 30 else 'danger' if rsi > 70 else 'muted'
             },
             'macd': {
-                'name': 'MACD (Moving Average Convergence Divergence)',
-                'value': indicators_data.get('macd'),
-                'signal': indicators_data.get('macd_signal'),
+                **_INDICATOR_CARDS['macd'],
+                'value': macd,
+                'signal': macd_signal,
                 'histogram': indicators_data.get('macd_histogram'),
-                'scale': 'Positive/Negative',
-                'explanation': 'Shows the relationship between two moving averages. MACD crossing above Signal is bullish, below is bearish.',
-                'interpretation': 'MACD > Signal: Bullish trend. MACD < Signal: Bearish trend. Histogram shows momentum strength.',
-                'color': 'success' if (indicators_data.get('macd') is not None and indicators_data.get('macd_signal') is not None and indicators_data.get('macd', 0) > indicators_data.get('macd_signal', 0)) else 'danger' if (indicators_data.get('macd') is not None and indicators_data.get('macd_signal') is not None) else 'muted'
+                'color': 'muted' if macd is None or macd_signal is None else 'success' if macd > macd_signal else 'danger'
             },
             'sma_20': {
-                'name': 'SMA 20 (Simple Moving Average - 20 periods)',
-                'value': indicators_data.get('sma_20'),
-                'scale': 'Price level',
-                'explanation': 'Average price over the last 20 periods. Price above SMA indicates uptrend, below indicates downtrend.',
-                'interpretation': 'Price > SMA: Bullish. Price < SMA: Bearish. Compare with SMA 50 for trend confirmation.',
-                'color': 'success' if (indicators_data.get('sma_20') is not None and current_price > indicators_data.get('sma_20', 0)) else 'danger' if (indicators_data.get('sma_20') is not None) else 'muted'
+                **_INDICATOR_CARDS['sma_20'],
+                'value': sma_20,
+                'color': 'muted' if sma_20 is None else 'success' if current_price > sma_20 else 'danger'
             },
             'sma_50': {
-                'name': 'SMA 50 (Simple Moving Average - 50 periods)',
-                'value': indicators_data.get('sma_50'),
-                'scale': 'Price level',
-                'explanation': 'Average price over the last 50 periods. Longer-term trend indicator compared to SMA 20.',
-                'interpretation': 'SMA 20 > SMA 50: Bullish crossover. SMA 20 < SMA 50: Bearish crossover.',
-                'color': 'success' if (indicators_data.get('sma_20') is not None and indicators_data.get('sma_50') is not None and indicators_data.get('sma_20', 0) > indicators_data.get('sma_50', 0)) else 'danger' if (indicators_data.get('sma_20') is not None and indicators_data.get('sma_50') is not None) else 'muted'
+                **_INDICATOR_CARDS['sma_50'],
+                'value': sma_50,
+                'color': 'muted' if sma_20 is None or sma_50 is None else 'success' if sma_20 > sma_50 else 'danger'
             },
             'bb_upper': {
-                'name': 'Bollinger Bands',
-                'upper': indicators_data.get('bb_upper'),
+                **_INDICATOR_CARDS['bb_upper'],
+                'upper': bb_upper,
                 'middle': indicators_data.get('bb_middle'),
-                'lower': indicators_data.get('bb_lower'),
-                'scale': 'Price levels (Upper/Middle/Lower)',
-                'explanation': 'Volatility bands around a moving average. Upper and lower bands represent standard deviations from the middle band.',
-                'interpretation': 'Price touches upper band: Overbought. Price touches lower band: Oversold. Narrow bands: Low volatility. Wide bands: High volatility.',
-                'color': 'danger' if (indicators_data.get('bb_upper') is not None and current_price > indicators_data.get('bb_upper', 0)) else 'success' if (indicators_data.get('bb_lower') is not None and current_price < indicators_data.get('bb_lower', 0)) else 'muted'
+                'lower': bb_lower,
+                'color': 'danger' if bb_upper is not None and current_price > bb_upper else 'success' if bb_lower is not None and current_price < bb_lower else 'muted'
             },
             'stoch_k': {
-                'name': 'Stochastic Oscillator',
-                'k': indicators_data.get('stoch_k'),
+                **_INDICATOR_CARDS['stoch_k'],
+                'k': stoch_k,
                 'd': indicators_data.get('stoch_d'),
-                'scale': '0-100',
-                'explanation': 'Compares closing price to price range over a period. Measures momentum and identifies overbought/oversold conditions.',
-                'interpretation': 'K > 80: Overbought (sell signal). K < 20: Oversold (buy signal). K crosses above D: Bullish. K crosses below D: Bearish.',
-                'color': 'danger' if (indicators_data.get('stoch_k') is not None and indicators_data.get('stoch_k', 50) > 80) else 'success' if (indicators_data.get('stoch_k') is not None and indicators_data.get('stoch_k', 50) < 20) else 'muted'
+                'color': 'muted' if stoch_k is None else 'danger' if stoch_k > 80 else 'success' if stoch_k < 20 else 'muted'
             },
             'adx': {
-                'name': 'ADX (Average Directional Index)',
-                'value': indicators_data.get('adx'),
-                'scale': '0-100',
-                'explanation': 'Measures trend strength regardless of direction. Higher values indicate stronger trends.',
-                'interpretation': 'ADX > 25: Strong trend. ADX < 20: Weak or no trend. ADX 20-25: Moderate trend. Does not indicate direction, only strength.',
-                'color': 'success' if (indicators_data.get('adx') is not None and indicators_data.get('adx', 0) > 25) else 'warning' if (indicators_data.get('adx') is not None and indicators_data.get('adx', 0) > 20) else 'muted'
+                **_INDICATOR_CARDS['adx'],
+                'value': adx,
+                'color': 'muted' if adx is None else 'success' if adx > 25 else 'warning' if adx > 20 else 'muted'
             },
             'volume_ratio': {
-                'name': 'Volume Ratio',
-                'value': indicators_data.get('volume_ratio'),
-                'scale': 'Multiplier (x)',
-                'explanation': 'Compares current volume to average volume. High volume confirms price movements.',
-                'interpretation': '> 1.5x: High volume (confirms trend). < 0.5x: Low volume (weak trend). 0.5-1.5x: Normal volume.',
-                'color': 'success' if (indicators_data.get('volume_ratio') is not None and indicators_data.get('volume_ratio', 1) > 1.5) else 'danger' if (indicators_data.get('volume_ratio') is not None and indicators_data.get('volume_ratio', 1) < 0.5) else 'muted'
+                **_INDICATOR_CARDS['volume_ratio'],
+                'value': volume_ratio,
+                'color': 'muted' if volume_ratio is None else 'success' if volume_ratio > 1.5 else 'danger' if volume_ratio < 0.5 else 'muted'
             },
             'support': {
-                'name': 'Support & Resistance',
-                'support': indicators_data.get('support'),
-                'resistance': indicators_data.get('resistance'),
-                'scale': 'Price levels',
-                'explanation': 'Support is a price level where buying pressure is strong. Resistance is where selling pressure is strong.',
-                'interpretation': 'Price near support: Potential bounce up. Price near resistance: Potential pullback. Breakthrough indicates trend continuation.',
-                'color': 'success' if (indicators_data.get('support') is not None and current_price < indicators_data.get('support', 0) * 1.02) else 'danger' if (indicators_data.get('resistance') is not None and current_price > indicators_data.get('resistance', 0) * 0.98) else 'muted'
+                **_INDICATOR_CARDS['support'],
+                'support': support,
+                'resistance': resistance,
+                'color': 'success' if support is not None and current_price < support * 1.02 else 'danger' if resistance is not None and current_price > resistance * 0.98 else 'muted'
             }
         }
     
-    # Prepare historical data for chart (use historical_data if available, otherwise use price_history)
-    chart_data = {
-        'labels': mark_safe(json.dumps([])),
-        'timestamps': mark_safe(json.dumps([])),
-        'prices': mark_safe(json.dumps([])),
-        'sma_20': mark_safe(json.dumps([])),
-        'sma_50': mark_safe(json.dumps([])),
-        'bb_upper': mark_safe(json.dumps([])),
-        'bb_middle': mark_safe(json.dumps([])),
-        'bb_lower': mark_safe(json.dumps([]))
-    }
-    
-    if historical_data and 'data' in historical_data:
-        if historical_data['source'] == 'binance':
-            klines = historical_data['data']
-            labels_list = []
-            timestamps_full = []
-            for kline in klines:
-                timestamp = kline['timestamp']
-                if hasattr(timestamp, 'strftime'):
-                    labels_list.append(timestamp.strftime('%H:%M'))
-                    timestamps_full.append({
-                        'date': timestamp.strftime('%Y-%m-%d'),
-                        'time': timestamp.strftime('%H:%M'),
-                        'datetime': timestamp.isoformat() if hasattr(timestamp, 'isoformat') else str(timestamp)
-                    })
-                elif isinstance(timestamp, str):
-                    try:
-                        from datetime import datetime
-                        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                        labels_list.append(dt.strftime('%H:%M'))
-                        timestamps_full.append({
-                            'date': dt.strftime('%Y-%m-%d'),
-                            'time': dt.strftime('%H:%M'),
-                            'datetime': dt.isoformat()
-                        })
-                    except:
-                        if ' ' in timestamp:
-                            time_part = timestamp.split(' ')[-1][:5]
-                            date_part = timestamp.split(' ')[0]
-                            labels_list.append(time_part)
-                            timestamps_full.append({
-                                'date': date_part,
-                                'time': time_part,
-                                'datetime': timestamp
-                            })
-                        else:
-                            labels_list.append(timestamp)
-                            timestamps_full.append({
-                                'date': '',
-                                'time': timestamp,
-                                'datetime': timestamp
-                            })
-                else:
-                    labels_list.append(str(timestamp))
-                    timestamps_full.append({
-                        'date': '',
-                        'time': str(timestamp),
-                        'datetime': timestamp
-                    })
-            prices_list = [float(kline['close']) for kline in klines]
-            chart_data['labels'] = mark_safe(json.dumps(labels_list))
-            chart_data['timestamps'] = mark_safe(json.dumps(timestamps_full))
-            chart_data['prices'] = mark_safe(json.dumps(prices_list))
-        else:
-            prices = historical_data['data'].get('prices', [])
-            labels_list = []
-            timestamps_full = []
-            for price_point in prices:
-                timestamp = price_point['timestamp']
-                if hasattr(timestamp, 'strftime'):
-                    labels_list.append(timestamp.strftime('%H:%M'))
-                    timestamps_full.append({
-                        'date': timestamp.strftime('%Y-%m-%d'),
-                        'time': timestamp.strftime('%H:%M'),
-                        'datetime': timestamp.isoformat() if hasattr(timestamp, 'isoformat') else str(timestamp)
-                    })
-                elif isinstance(timestamp, str):
-                    try:
-                        from datetime import datetime
-                        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                        labels_list.append(dt.strftime('%H:%M'))
-                        timestamps_full.append({
-                            'date': dt.strftime('%Y-%m-%d'),
-                            'time': dt.strftime('%H:%M'),
-                            'datetime': dt.isoformat()
-                        })
-                    except:
-                        if ' ' in timestamp:
-                            time_part = timestamp.split(' ')[-1][:5]
-                            date_part = timestamp.split(' ')[0]
-                            labels_list.append(time_part)
-                            timestamps_full.append({
-                                'date': date_part,
-                                'time': time_part,
-                                'datetime': timestamp
-                            })
-                        else:
-                            labels_list.append(timestamp)
-                            timestamps_full.append({
-                                'date': '',
-                                'time': timestamp,
-                                'datetime': timestamp
-                            })
-                else:
-                    labels_list.append(str(timestamp))
-                    timestamps_full.append({
-                        'date': '',
-                        'time': str(timestamp),
-                        'datetime': timestamp
-                    })
-            prices_list = [float(price_point['price']) for price_point in prices]
-            chart_data['labels'] = mark_safe(json.dumps(labels_list))
-            chart_data['timestamps'] = mark_safe(json.dumps(timestamps_full))
-            chart_data['prices'] = mark_safe(json.dumps(prices_list))
-        
-        # Add historical indicators
-        if historical_indicators:
-            chart_data['sma_20'] = mark_safe(json.dumps([x for x in historical_indicators.get('sma_20', []) if x is not None]))
-            chart_data['sma_50'] = mark_safe(json.dumps([x for x in historical_indicators.get('sma_50', []) if x is not None]))
-            chart_data['bb_upper'] = mark_safe(json.dumps([x for x in historical_indicators.get('bb_upper', []) if x is not None]))
-            chart_data['bb_middle'] = mark_safe(json.dumps([x for x in historical_indicators.get('bb_middle', []) if x is not None]))
-            chart_data['bb_lower'] = mark_safe(json.dumps([x for x in historical_indicators.get('bb_lower', []) if x is not None]))
-    elif price_history:
-        labels_list = []
-        timestamps_full = []
-        for ph in price_history:
-            if hasattr(ph.timestamp, 'strftime'):
-                labels_list.append(ph.timestamp.strftime('%H:%M'))
-                timestamps_full.append({
-                    'date': ph.timestamp.strftime('%Y-%m-%d'),
-                    'time': ph.timestamp.strftime('%H:%M'),
-                    'datetime': ph.timestamp.isoformat() if hasattr(ph.timestamp, 'isoformat') else str(ph.timestamp)
-                })
-            else:
-                labels_list.append(str(ph.timestamp))
-                timestamps_full.append({
-                    'date': '',
-                    'time': str(ph.timestamp),
-                    'datetime': ph.timestamp
-                })
-        prices_list = [float(ph.price) for ph in price_history]
-        chart_data['labels'] = mark_safe(json.dumps(labels_list))
-        chart_data['timestamps'] = mark_safe(json.dumps(timestamps_full))
-        chart_data['prices'] = mark_safe(json.dumps(prices_list))
-    
+    # The chart payload ships through the chart_data_json endpoint so the
+    # browser can cache it; the page only decides whether to draw the card
     context = {
         'crypto': crypto,
         'current_price': current_price,
         'indicators': indicators_data,
         'indicator_info': indicator_info,
         'analysis': latest_analysis,
-        'price_history': price_history,
-        'historical_data': historical_data,
-        'historical_indicators': historical_indicators,
-        'chart_data': chart_data
+        'analysis_refreshing': analysis_refreshing,
+        'has_chart': has_chart
     }
     return render(request, 'cryptos/crypto_analysis.html', context)
 
@@ -674,22 +697,36 @@ def crypto_analysis(request, crypto_id):
 @login_required
 def analysis_overview(request):
     """Overview of all technical analyses"""
-    cryptos = Crypto.objects.all()
+    # Latest analysis per crypto in one correlated subquery instead of a
+    # filter().first() round trip per row
+    latest_analysis_id = TechnicalAnalysis.objects.filter(
+        crypto=OuterRef('pk')
+    ).order_by('-analysis_date').values('pk')[:1]
+    cryptos = list(
+        Crypto.objects.annotate(latest_analysis_id=Subquery(latest_analysis_id))
+    )
+    analysis_by_id = TechnicalAnalysis.objects.in_bulk(
+        [c.latest_analysis_id for c in cryptos if c.latest_analysis_id]
+    )
+
+    # One manager and one batched price fetch for every symbol on the page
+    price_map = api_manager.get_current_prices(
+        c.symbol for c in cryptos if c.latest_analysis_id
+    )
+
     analyses = []
-    
     for crypto in cryptos:
-        analysis = TechnicalAnalysis.objects.filter(crypto=crypto).first()
+        analysis = analysis_by_id.get(crypto.latest_analysis_id)
         if analysis:
-            api_manager = APIManager()
-            price_data = api_manager.get_current_price(crypto.symbol)
+            price_data = price_map.get(crypto.symbol)
             current_price = float(price_data['price']) if price_data and price_data.get('price') else 0.0
-            
+
             analyses.append({
                 'crypto': crypto,
                 'analysis': analysis,
                 'current_price': current_price
             })
-    
+
     context = {
         'analyses': analyses
     }
@@ -701,50 +738,114 @@ def analysis_overview(request):
 def update_price(request, crypto_id):
     """Update price for a cryptocurrency (AJAX endpoint)"""
     crypto = get_object_or_404(Crypto, id=crypto_id)
-    api_manager = APIManager()
     
     price_data = api_manager.get_current_price(crypto.symbol)
     if price_data:
-        # Save to PriceHistory
-        PriceHistory.objects.create(
-            crypto=crypto,
-            timestamp=timezone.now(),
-            price=price_data['price'],
-            volume=price_data.get('volume_24h', 0),
-            high=price_data.get('high_24h', price_data['price']),
-            low=price_data.get('low_24h', price_data['price']),
-            open_price=price_data['price'],
-            close_price=price_data['price']
-        )
+        # With auto price updates on, the background sweep persists every
+        # symbol through one batched bulk_create per cycle — an INSERT per
+        # UI poll here would only duplicate those ticks. The write stays
+        # for setups where polling is the sole source of history.
+        if not AppSettings.get_settings().auto_update_prices:
+            history = PriceHistory.objects.create(
+                crypto=crypto,
+                timestamp=timezone.now(),
+                price=price_data['price'],
+                volume=price_data.get('volume_24h', 0),
+                high=price_data.get('high_24h', price_data['price']),
+                low=price_data.get('low_24h', price_data['price']),
+                open_price=price_data['price'],
+                close_price=price_data['price']
+            )
+            # Keep the denormalized latest-price columns in step with the
+            # new history row, same as the batched writers
+            crypto.latest_price = history.price
+            crypto.latest_price_at = history.timestamp
+            crypto.save(update_fields=['latest_price', 'latest_price_at'])
         return JsonResponse({'success': True, 'price': price_data['price']})
-    
+
     return JsonResponse({'success': False, 'error': 'Failed to fetch price'})
 
 
+@login_required
+@cache_control(max_age=60, private=True)
+@require_http_methods(["GET"])
+def chart_data_json(request, crypto_id):
+    """Chart series for one crypto as cacheable JSON (AJAX endpoint).
+
+    Served apart from the analysis page so the browser can cache the
+    payload: within max_age reloads skip the request entirely, and after
+    that an If-None-Match revalidation of unchanged data costs a 304
+    instead of re-shipping the series.
+    """
+    crypto = get_object_or_404(Crypto, id=crypto_id)
+    app_settings = AppSettings.get_settings()
+    historical_data = api_manager.get_historical_data(
+        crypto.symbol, days=app_settings.historical_days
+    )
+    payload = json.dumps(
+        _build_chart_data(crypto, historical_data), separators=(',', ':')
+    )
+    etag = f'"{hashlib.sha1(payload.encode()).hexdigest()}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(payload, content_type='application/json')
+    response['ETag'] = etag
+    return response
+
+
+@login_required
+@require_http_methods(["POST"])
+def submit_analysis(request, crypto_id):
+    """Queue a full analysis for one crypto on the worker pool (AJAX endpoint)"""
+    crypto = get_object_or_404(Crypto, id=crypto_id)
+    job_id = analysis_worker.submit(analysis_worker.run_crypto_analysis, crypto.id)
+    return JsonResponse({'success': True, 'job_id': job_id})
+
+
+@login_required
+@require_http_methods(["GET"])
+def analysis_job_status(request, job_id):
+    """Poll a queued analysis job (AJAX endpoint)"""
+    status = analysis_worker.get_status(job_id)
+    return JsonResponse({'success': status['status'] != 'unknown', **status})
+
+
 @login_required
 @require_http_methods(["GET", "POST"])
 def get_price(request, symbol=None):
     """Get current price for a symbol (used for auto-fill in add form)"""
     if request.method == 'POST':
-        # Try to get symbol from POST body (JSON or form data)
-        import json
-        try:
-            body = json.loads(request.body)
-            symbol = body.get('symbol', '')
-        except:
+        # JSON and form posts both land here; dispatch on the declared
+        # content type instead of a bare except around the JSON parse
+        if request.content_type == 'application/json':
+            try:
+                symbol = json.loads(request.body).get('symbol', '')
+            except ValueError:
+                symbol = ''
+        else:
             symbol = request.POST.get('symbol', '')
     else:
         symbol = symbol or request.GET.get('symbol', '')
-    
+
+    symbol = symbol.strip().upper() if symbol else ''
     if not symbol:
         return JsonResponse({'success': False, 'error': 'Symbol required'})
-    
-    api_manager = APIManager()
-    price_data = api_manager.get_current_price(symbol.strip().upper())
-    
+
+    price_data = api_manager.get_current_price(symbol)
+
     if price_data and price_data.get('price'):
-        return JsonResponse({'success': True, 'price': price_data['price']})
-    
+        response = JsonResponse({'success': True, 'price': price_data['price']})
+        if request.method == 'GET':
+            # Let browser polls revalidate while the price is unchanged;
+            # max-age mirrors the server-side price cache TTL
+            etag = f'"{hashlib.sha1(response.content).hexdigest()}"'
+            if request.headers.get('If-None-Match') == etag:
+                response = HttpResponse(status=304)
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, max-age=5'
+        return response
+
     return JsonResponse({'success': False, 'error': 'Failed to fetch price'})
 
 
@@ -760,22 +861,17 @@ def settings_view(request):
         ollama_service = OllamaService(base_url=settings.ollama_base_url)
         available_models = ollama_service.list_models()
         
-        # Check if Plutus exists, if not use first available model
+        # Check if Plutus exists, if not use first available model: one
+        # pass over the names instead of three separate scans
         if available_models:
-            model_names = [m.get('name', '').lower() for m in available_models]
-            if 'plutus' in model_names or any('plutus' in m.get('name', '').lower() for m in available_models):
-                # Find exact Plutus model name
-                for m in available_models:
-                    if 'plutus' in m.get('name', '').lower():
-                        default_model = m.get('name', 'plutus')
-                        break
-            else:
-                # Use first available model
-                default_model = available_models[0].get('name', 'plutus')
-            
+            model_names = [m.get('name', '') for m in available_models]
+            default_model = next(
+                (name for name in model_names if 'plutus' in name.lower()),
+                model_names[0] or 'plutus'
+            )
+
             # If current model is not in available models, update to default
-            current_model_names = [m.get('name', '') for m in available_models]
-            if settings.ollama_model not in current_model_names:
+            if settings.ollama_model not in model_names:
                 settings.ollama_model = default_model
                 settings.save(update_fields=['ollama_model'])
     except Exception as e:
@@ -783,20 +879,32 @@ def settings_view(request):
         pass
     
     if request.method == 'POST':
-        # Update settings
-        settings.auto_update_prices = request.POST.get('auto_update_prices') == 'on'
-        settings.price_update_interval = int(request.POST.get('price_update_interval', 60))
-        settings.auto_run_analysis = request.POST.get('auto_run_analysis') == 'on'
-        settings.analysis_interval = int(request.POST.get('analysis_interval', 360))
-        settings.ollama_base_url = request.POST.get('ollama_base_url', 'http://localhost:11434')
-        settings.ollama_model = request.POST.get('ollama_model', default_model)
-        settings.historical_days = int(request.POST.get('historical_days', 30))
-        settings.save()
-        
-        # Restart background tasks
-        task_manager = BackgroundTaskManager()
-        task_manager.restart()
-        
+        # Parse the form once into typed values, then write only the
+        # columns that actually changed
+        post = request.POST
+        new_values = {
+            'auto_update_prices': post.get('auto_update_prices') == 'on',
+            'price_update_interval': int(post.get('price_update_interval', 60)),
+            'auto_run_analysis': post.get('auto_run_analysis') == 'on',
+            'analysis_interval': int(post.get('analysis_interval', 360)),
+            'ollama_base_url': post.get('ollama_base_url', 'http://localhost:11434'),
+            'ollama_model': post.get('ollama_model', default_model),
+            'historical_days': int(post.get('historical_days', 30)),
+        }
+        changed = [
+            field for field, value in new_values.items()
+            if getattr(settings, field) != value
+        ]
+        if changed:
+            for field in changed:
+                setattr(settings, field, new_values[field])
+            settings.save(update_fields=changed)
+
+            # Restart background tasks only when there is a change for
+            # them to pick up
+            task_manager = BackgroundTaskManager()
+            task_manager.restart()
+
         messages.success(request, 'Settings updated successfully!')
         return redirect('cryptos:settings')
     